@@ -2,6 +2,13 @@
 # exit on error
 set -o errexit
 
+# Processes to run after this build (also listed in Procfile):
+#   web:    gunicorn portfolio_project.wsgi
+#   worker: python manage.py run_worker
+# The worker performs file uploads and notification emails queued by the web
+# process; without it, uploaded images and resumes are never stored. On Render,
+# add a Background Worker service with the same build and that start command.
+
 pip install -r requirements.txt
 
 python manage.py collectstatic --no-input
@@ -1,56 +1,345 @@
-from django.contrib import admin
+from contextvars import ContextVar
+
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+from django.contrib.admin.views.main import ChangeList
+from django.db.models import Count
+from django.utils import timezone
 from django.utils.html import format_html
 from django.urls import reverse
+from .cache import portfolio_cache
+from .engagement import current_score
 from .models import ClickEvent 
 from .models import (
     GeneralInfo, SkillCategory, Skill, Expertise,
-    ProjectCategory, Tag, Project, SocialLink,ContactSubmission
+    ProjectCategory, Tag, Project, SocialLink,ContactSubmission, Task,
+    UserAgent, IPAddress, Tenant, Domain, ShortLink
 )
 
+class TrimmedChangeList(ChangeList):
+    """Loads only the columns a changelist needs, via the model's `for_changelist()`."""
+
+    def get_queryset(self, request, exclude_parameters=None):
+        return super().get_queryset(request, exclude_parameters).for_changelist()
+
+
+class TrimmedChangelistMixin:
+    # The change form still loads full rows; only the list view is trimmed.
+    def get_changelist(self, request, **kwargs):
+        return TrimmedChangeList
+
+
+def has_tenant_field(model):
+    return any(field.name == 'tenant' for field in model._meta.get_fields())
+
+
+def link_all(queryset, field_name, target):
+    """Links every row of `queryset` to `target` through M2M `field_name` in one INSERT, skipping existing links."""
+    field = queryset.model._meta.get_field(field_name)
+    through = field.remote_field.through
+    source_id, target_id = f'{field.m2m_field_name()}_id', f'{field.m2m_reverse_field_name()}_id'
+    rows = [through(**{source_id: pk, target_id: target.pk}) for pk in queryset.values_list('pk', flat=True)]
+    through.objects.bulk_create(rows, ignore_conflicts=True)
+    return len(rows)
+
+
+def unlink_all(queryset, field_name, target):
+    """Removes the M2M `field_name` links between the rows of `queryset` and `target`."""
+    field = queryset.model._meta.get_field(field_name)
+    links = field.remote_field.through.objects.filter(**{
+        f'{field.m2m_field_name()}__in': queryset.values('pk'),
+        field.m2m_reverse_field_name(): target,
+    })
+    return links.delete()[0]
+
+
+def is_tenant_member(request):
+    """Superusers manage every portfolio; other staff only those they're members of."""
+    if not hasattr(request, '_is_tenant_member'):
+        user = request.user
+        request._is_tenant_member = user.is_active and (
+            user.is_superuser or request.tenant.members.filter(pk=user.pk).exists()
+        )
+    return request._is_tenant_member
+
+
+# The tenant whose changelist is being served. Django builds action forms
+# without the request, so TenantActionForm reads its tenant from here.
+_changelist_tenant = ContextVar('changelist_tenant', default=None)
+
+
+class TenantActionForm(ActionForm):
+    """An ActionForm whose model choice fields only offer the current tenant's rows."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        tenant = _changelist_tenant.get()
+        for field in self.fields.values():
+            if isinstance(field, forms.ModelChoiceField):
+                field.queryset = field.queryset.filter(tenant=tenant) if tenant else field.queryset.none()
+
+
+class TenantScopedAdminMixin:
+    """
+    Limits an admin to the portfolio of the host it's served on (request.tenant):
+    rows, related choices and permissions. The tenant is never a form field; new
+    objects get the request's tenant before validation, so per-tenant unique
+    constraints are checked like any other.
+    """
+    tenant_lookup = 'tenant'
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).filter(**{self.tenant_lookup: request.tenant})
+
+    def get_exclude(self, request, obj=None):
+        exclude = tuple(super().get_exclude(request, obj) or ())
+        return exclude + ('tenant',) if has_tenant_field(self.model) else exclude
+
+    def get_form(self, request, obj=None, **kwargs):
+        form = super().get_form(request, obj, **kwargs)
+        if not has_tenant_field(self.model):
+            return form
+        tenant = request.tenant
+
+        class TenantForm(form):
+            def _post_clean(self):
+                self.instance.tenant = tenant
+                super()._post_clean()
+
+            def _get_validation_exclusions(self):
+                exclude = super()._get_validation_exclusions()
+                exclude.discard('tenant')
+                return exclude
+
+        return TenantForm
+
+    def changelist_view(self, request, extra_context=None):
+        token = _changelist_tenant.set(request.tenant)
+        try:
+            return super().changelist_view(request, extra_context)
+        finally:
+            _changelist_tenant.reset(token)
+
+    def action_choice(self, request, name):
+        """The object picked in the action form's `name` field, or None."""
+        form = self.action_form(request.POST, auto_id=None)
+        form.fields['action'].choices = self.get_action_choices(request)
+        return form.cleaned_data.get(name) if form.is_valid() else None
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        self._scope_choices(db_field, request, kwargs)
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+    def formfield_for_manytomany(self, db_field, request, **kwargs):
+        self._scope_choices(db_field, request, kwargs)
+        return super().formfield_for_manytomany(db_field, request, **kwargs)
+
+    def _scope_choices(self, db_field, request, kwargs):
+        related = db_field.remote_field.model
+        if related is not Tenant and has_tenant_field(related):
+            kwargs['queryset'] = related._default_manager.filter(tenant=request.tenant)
+
+    def has_module_permission(self, request):
+        return is_tenant_member(request) and super().has_module_permission(request)
+
+    def has_view_permission(self, request, obj=None):
+        return is_tenant_member(request) and super().has_view_permission(request, obj)
+
+    def has_add_permission(self, request, *args):
+        return is_tenant_member(request) and super().has_add_permission(request, *args)
+
+    def has_change_permission(self, request, obj=None):
+        return is_tenant_member(request) and super().has_change_permission(request, obj)
+
+    def has_delete_permission(self, request, obj=None):
+        return is_tenant_member(request) and super().has_delete_permission(request, obj)
+
+
+class SuperuserOnlyAdminMixin:
+    """For rows shared by every tenant, which only superusers may see."""
+
+    def has_module_permission(self, request):
+        return request.user.is_superuser
+
+    def has_view_permission(self, request, obj=None):
+        return request.user.is_superuser
+
+    def has_change_permission(self, request, obj=None):
+        return request.user.is_superuser and super().has_change_permission(request, obj)
+
+    def has_delete_permission(self, request, obj=None):
+        return request.user.is_superuser and super().has_delete_permission(request, obj)
+
+
+class TenantScopedAdmin(TenantScopedAdminMixin, admin.ModelAdmin):
+    pass
+
+
+class DomainInline(admin.TabularInline):
+    model = Domain
+    extra = 1
+
+
+@admin.register(Tenant)
+class TenantAdmin(SuperuserOnlyAdminMixin, admin.ModelAdmin):
+    list_display = ('name', 'slug', 'is_active')
+    list_filter = ('is_active',)
+    prepopulated_fields = {'slug': ('name',)}
+    filter_horizontal = ('members',)
+    inlines = [DomainInline]
+
+    def has_add_permission(self, request):
+        return request.user.is_superuser
+
+
 # Use inline for a better editing experience when inside a Category
 class SkillInline(admin.TabularInline):
     model = Skill
     extra = 1
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('category')
+
 @admin.register(SkillCategory)
-class SkillCategoryAdmin(admin.ModelAdmin):
+class SkillCategoryAdmin(TenantScopedAdminMixin, admin.ModelAdmin):
+    list_display = ('name', 'skill_count')
     inlines = [SkillInline]
     prepopulated_fields = {'slug': ('name',)}
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(skill_count=Count('skills'))
+
+    @admin.display(description='Skills', ordering='skill_count')
+    def skill_count(self, obj):
+        return obj.skill_count
+
+class SkillActionForm(TenantActionForm):
+    category = forms.ModelChoiceField(SkillCategory.objects.all(), required=False, empty_label="Category")
+
+
 # --- [NEW] Register the Skill model directly ---
 @admin.register(Skill)
-class SkillAdmin(admin.ModelAdmin):
+class SkillAdmin(TenantScopedAdminMixin, TrimmedChangelistMixin, admin.ModelAdmin):
     # This shows the skill name and its category in the list
     list_display = ('name', 'category')
+    list_select_related = ('category',)
+    tenant_lookup = 'category__tenant'
     # This adds a filter sidebar to filter skills by their category
-    list_filter = ('category',)
+    list_filter = (('category', admin.RelatedOnlyFieldListFilter),)
     # This adds a search bar to search by skill name
     search_fields = ('name',)
+    action_form = SkillActionForm
+    actions = ['move_to_category']
+
+    @admin.action(description='Move selected skills to the chosen category', permissions=['change'])
+    def move_to_category(self, request, queryset):
+        category = self.action_choice(request, 'category')
+        if category is None:
+            self.message_user(request, "Choose a category for this action.", messages.WARNING)
+            return
+        # One UPDATE, and one cache invalidation instead of a save signal per skill.
+        moved = queryset.update(category=category)
+        portfolio_cache.invalidate(namespace=request.tenant.pk)
+        self.message_user(request, f"{moved} skill(s) moved to '{category}'.")
+
+    # Skill.__str__ reads the category, e.g. on the delete confirmation page
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('category')
 
 
 @admin.register(ProjectCategory)
-class ProjectCategoryAdmin(admin.ModelAdmin):
+class ProjectCategoryAdmin(TenantScopedAdminMixin, admin.ModelAdmin):
+    list_display = ('name', 'project_count')
     prepopulated_fields = {'slug': ('name',)}
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(project_count=Count('projects'))
+
+    @admin.display(description='Projects', ordering='project_count')
+    def project_count(self, obj):
+        return obj.project_count
+
+class ProjectActionForm(TenantActionForm):
+    category = forms.ModelChoiceField(ProjectCategory.objects.all(), required=False, empty_label="Category")
+    tag = forms.ModelChoiceField(Tag.objects.all(), required=False, empty_label="Tag")
+
+
 @admin.register(Project)
-class ProjectAdmin(admin.ModelAdmin):
-    list_display = ('title', 'is_featured')
-    list_filter = ('is_featured', 'categories')
+class ProjectAdmin(TenantScopedAdminMixin, TrimmedChangelistMixin, admin.ModelAdmin):
+    list_display = ('title', 'is_featured', 'engagement')
+    list_filter = ('is_featured', ('categories', admin.RelatedOnlyFieldListFilter))
     filter_horizontal = ('categories', 'tags')
+    # Each action is a fixed number of queries however many rows are selected.
+    # Bulk writes send no save/m2m signals, so each action invalidates the
+    # tenant's cache once itself.
+    action_form = ProjectActionForm
+    actions = [
+        'feature', 'unfeature', 'add_to_category', 'remove_from_category', 'add_tag', 'remove_tag',
+    ]
+
+    @admin.display(description='Engagement', ordering='engagement_score')
+    def engagement(self, obj):
+        return f"{current_score(obj):.1f}"
+
+    @admin.action(description='Feature selected projects', permissions=['change'])
+    def feature(self, request, queryset):
+        updated = queryset.update(is_featured=True)
+        portfolio_cache.invalidate(namespace=request.tenant.pk)
+        self.message_user(request, f"{updated} project(s) featured.")
+
+    @admin.action(description='Unfeature selected projects', permissions=['change'])
+    def unfeature(self, request, queryset):
+        updated = queryset.update(is_featured=False)
+        portfolio_cache.invalidate(namespace=request.tenant.pk)
+        self.message_user(request, f"{updated} project(s) unfeatured.")
+
+    @admin.action(description='Add selected projects to the chosen category', permissions=['change'])
+    def add_to_category(self, request, queryset):
+        self._relink(request, queryset, 'categories', 'category', link_all, "added to")
+
+    @admin.action(description='Remove selected projects from the chosen category', permissions=['change'])
+    def remove_from_category(self, request, queryset):
+        self._relink(request, queryset, 'categories', 'category', unlink_all, "removed from")
+
+    @admin.action(description='Tag selected projects with the chosen tag', permissions=['change'])
+    def add_tag(self, request, queryset):
+        self._relink(request, queryset, 'tags', 'tag', link_all, "added to")
+
+    @admin.action(description='Remove the chosen tag from selected projects', permissions=['change'])
+    def remove_tag(self, request, queryset):
+        self._relink(request, queryset, 'tags', 'tag', unlink_all, "removed from")
+
+    def _relink(self, request, queryset, field_name, choice, change, verb):
+        target = self.action_choice(request, choice)
+        if target is None:
+            self.message_user(request, f"Choose a {choice} for this action.", messages.WARNING)
+            return
+        count = change(queryset, field_name, target)
+        portfolio_cache.invalidate(namespace=request.tenant.pk)
+        self.message_user(request, f"{count} project(s) {verb} {choice} '{target}'.")
 
 
 @admin.register(ClickEvent)
-class ClickEventAdmin(admin.ModelAdmin):
-    list_display = ('timestamp', 'action_type', 'get_project_link', 'ip_address')
-    list_filter = ('action_type', 'timestamp')
-    search_fields = ('ip_address', 'user_agent', 'details', 'project__title')
-    readonly_fields = ('timestamp', 'action_type', 'ip_address', 'user_agent', 'details', 'get_project_link')
+class ClickEventAdmin(TenantScopedAdminMixin, TrimmedChangelistMixin, admin.ModelAdmin):
+    list_display = ('timestamp', 'action_type', 'get_project_link', 'ip', 'agent')
+    list_select_related = ('project', 'ip', 'agent')
+    list_filter = ('action_type', 'timestamp', 'agent__device', 'agent__browser', 'agent__os', 'agent__is_bot')
+    search_fields = ('ip__address', 'details', 'project__title')
+    readonly_fields = ('timestamp', 'action_type', 'ip', 'agent', 'get_user_agent', 'details', 'get_project_link')
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('project', 'ip', 'agent')
+
+    @admin.display(description='Raw user agent')
+    def get_user_agent(self, obj):
+        return obj.agent.user_agent if obj.agent_id else "N/A"
 
     @admin.display(description='Project Title')
     def get_project_link(self, obj):
-        if obj.project:
+        if obj.project_id:
             # Create a link to the project's own admin page
-            url = reverse('admin:portfolio_project_change', args=[obj.project.pk])
+            url = reverse('admin:portfolio_project_change', args=[obj.project_id])
             return format_html('<a href="{}">{}</a>', url, obj.project.title)
         # For non-project clicks, show the details if they exist
         return obj.details or "N/A"
@@ -62,8 +351,65 @@ class ClickEventAdmin(admin.ModelAdmin):
         return False
 
 
+@admin.register(ShortLink)
+class ShortLinkAdmin(TenantScopedAdminMixin, admin.ModelAdmin):
+    # Links are maintained from their project or resume; see portfolio/shortlinks.py
+    list_display = ('code', 'action_type', 'project', 'target_url')
+    list_select_related = ('project',)
+    list_filter = ('action_type',)
+    search_fields = ('code', 'target_url', 'project__title')
+    readonly_fields = ('code', 'action_type', 'project', 'target_url')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(UserAgent)
+class UserAgentAdmin(SuperuserOnlyAdminMixin, admin.ModelAdmin):
+    list_display = ('browser', 'os', 'device', 'is_bot', 'click_count')
+    list_filter = ('device', 'browser', 'os', 'is_bot')
+    search_fields = ('user_agent',)
+    readonly_fields = ('ua_hash', 'user_agent', 'browser', 'os', 'device', 'is_bot')
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(click_count=Count('click_events'))
+
+    @admin.display(description='Clicks', ordering='click_count')
+    def click_count(self, obj):
+        return obj.click_count
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False  # Click events reference these rows, and intern_*() memoizes their pks
+
+
+@admin.register(IPAddress)
+class IPAddressAdmin(SuperuserOnlyAdminMixin, admin.ModelAdmin):
+    list_display = ('address', 'click_count')
+    search_fields = ('address',)
+    readonly_fields = ('address',)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(click_count=Count('click_events'))
+
+    @admin.display(description='Clicks', ordering='click_count')
+    def click_count(self, obj):
+        return obj.click_count
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
 @admin.register(ContactSubmission)
-class ContactSubmissionAdmin(admin.ModelAdmin):
+class ContactSubmissionAdmin(TenantScopedAdminMixin, TrimmedChangelistMixin, admin.ModelAdmin):
     list_display = ('name', 'email', 'subject', 'timestamp')
     list_filter = ('timestamp',)
     search_fields = ('name', 'email', 'subject', 'message')
@@ -74,9 +420,26 @@ class ContactSubmissionAdmin(admin.ModelAdmin):
 
     def has_change_permission(self, request, obj=None):
         return False # Disable editing submissions
+
+
+@admin.register(Task)
+class TaskAdmin(SuperuserOnlyAdminMixin, TrimmedChangelistMixin, admin.ModelAdmin):
+    list_display = ('name', 'status', 'attempts', 'run_at', 'updated_at')
+    list_filter = ('status', 'name')
+    readonly_fields = ('name', 'payload', 'idempotency_key', 'attempts', 'created_at', 'updated_at', 'last_error')
+    exclude = ('data',)
+    actions = ['retry_now']
+
+    @admin.action(description='Retry selected tasks now')
+    def retry_now(self, request, queryset):
+        updated = queryset.exclude(status=Task.RUNNING).update(status=Task.PENDING, run_at=timezone.now(), attempts=0)
+        self.message_user(request, f"{updated} task(s) queued for retry.")
+
+    def has_add_permission(self, request):
+        return False
    
 # Register the rest of the models
-admin.site.register(GeneralInfo)
-admin.site.register(Expertise)
-admin.site.register(Tag)
-admin.site.register(SocialLink)
\ No newline at end of file
+admin.site.register(GeneralInfo, TenantScopedAdmin)
+admin.site.register(Expertise, TenantScopedAdmin)
+admin.site.register(Tag, TenantScopedAdmin)
+admin.site.register(SocialLink, TenantScopedAdmin)
\ No newline at end of file
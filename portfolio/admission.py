@@ -0,0 +1,211 @@
+# portfolio/admission.py
+"""
+Admission control. Each view has a priority class; under load the cheapest
+work to lose goes first:
+
+- TRACKING (click tracking, short-link redirects) keeps responding but stops
+  recording once the worker is half full or the database is slow; the view
+  checks `request.shed_writes` and skips its writes.
+- NORMAL (contact POSTs, the admin, everything unmarked) gets a 503 once the
+  worker is at its in-flight limit.
+- PAGE (portfolio page views) is always admitted.
+
+"Database is slow" is adaptive: the recent query latency (fast EWMA) is
+compared with a baseline (slow EWMA) learned while the database was healthy.
+The baseline stays frozen through a spike, but only for so long: latency that
+stays high becomes the new normal rather than shedding forever.
+In-flight counts are per process. A sync gunicorn worker (the Procfile's
+default) runs one request at a time, so in_flight never reaches the limit and
+only the latency signal sheds anything; the limits apply with threaded
+(`--threads`) or async workers.
+"""
+
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache as shared_cache
+from django.db import connection
+from django.http import HttpResponse
+from django.urls import Resolver404, resolve
+
+PAGE, NORMAL, TRACKING = 'page', 'normal', 'tracking'
+
+SHED_COUNTER_KEY = 'admission:shed:{}'
+# Shed requests are counted in memory and added to the shared counters at
+# most this often (seconds), so shedding under load costs no cache round trip.
+SHED_FLUSH_INTERVAL = 5.0
+
+
+def admission_priority(level):
+    """Assigns a view to PAGE or TRACKING; unmarked views are NORMAL."""
+    def decorator(view_func):
+        view_func.admission_priority = level
+        return view_func
+    return decorator
+
+
+def request_priority(request):
+    try:
+        level = getattr(resolve(request.path_info).func, 'admission_priority', NORMAL)
+    except Resolver404:
+        return NORMAL
+    # A POST to a page (the contact form) is a write, not a page view.
+    if level == PAGE and request.method not in ('GET', 'HEAD'):
+        return NORMAL
+    return level
+
+
+class LatencyMonitor:
+    """Tracks DB query latency against a baseline learned while healthy."""
+
+    def __init__(self, tolerance=2.0, floor=0.005, fast_alpha=0.2, slow_alpha=0.01, max_frozen=60.0):
+        self.tolerance = tolerance
+        self.floor = floor  # Below this (seconds) latency never counts as slow
+        self.fast_alpha = fast_alpha
+        self.slow_alpha = slow_alpha
+        self.max_frozen = max_frozen  # Seconds of overload before the baseline adapts again
+        self.recent = None
+        self.baseline = None
+        self._overloaded_since = None
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        with self._lock:
+            if self.recent is None:
+                self.recent = self.baseline = seconds
+                return
+            self.recent += self.fast_alpha * (seconds - self.recent)
+            # Freeze the baseline while overloaded so it can't drift up to meet
+            # a spike; past max_frozen, the higher latency is the new normal.
+            if self._overloaded():
+                now = time.monotonic()
+                if self._overloaded_since is None:
+                    self._overloaded_since = now
+                if now - self._overloaded_since < self.max_frozen:
+                    return
+            else:
+                self._overloaded_since = None
+            self.baseline += self.slow_alpha * (seconds - self.baseline)
+
+    def overloaded(self):
+        with self._lock:
+            return self._overloaded()
+
+    def _overloaded(self):
+        return self.recent is not None and self.recent > max(self.baseline * self.tolerance, self.floor)
+
+
+class AdmissionController:
+    def __init__(self, max_in_flight, latency):
+        self.max_in_flight = max_in_flight
+        self.latency = latency
+        self.in_flight = 0
+        self._lock = threading.Lock()
+
+    def admit(self, level):
+        """Returns 'admit', 'shed' (run without writes) or 'reject'; admitted requests must call release()."""
+        with self._lock:
+            busy = self.in_flight
+            if level == NORMAL and busy >= self.max_in_flight:
+                return 'reject'
+            self.in_flight += 1
+        if level == TRACKING and (busy >= max(self.max_in_flight // 2, 1) or self.latency.overloaded()):
+            return 'shed'
+        return 'admit'
+
+    def release(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def time_query(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.latency.observe(time.perf_counter() - start)
+
+
+class ShedCounter:
+    """Per-process shed counts, flushed to the shared cache every `flush_interval` seconds."""
+
+    def __init__(self, flush_interval=SHED_FLUSH_INTERVAL):
+        self.flush_interval = flush_interval
+        self.pending = {}
+        self._flushed_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def count(self, level):
+        with self._lock:
+            self.pending[level] = self.pending.get(level, 0) + 1
+            due = time.monotonic() - self._flushed_at >= self.flush_interval
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            pending, self.pending = self.pending, {}
+            self._flushed_at = time.monotonic()
+        for level, count in pending.items():
+            key = SHED_COUNTER_KEY.format(level)
+            try:
+                try:
+                    shared_cache.incr(key, count)
+                except ValueError:
+                    if not shared_cache.add(key, count, None):
+                        shared_cache.incr(key, count)
+            except Exception:
+                # Keep the count for the next flush rather than fail the request.
+                with self._lock:
+                    self.pending[level] = self.pending.get(level, 0) + count
+
+    def totals(self):
+        """All processes' flushed counts; this process's are flushed first."""
+        self.flush()
+        return {level: shared_cache.get(SHED_COUNTER_KEY.format(level), 0) for level in (TRACKING, NORMAL)}
+
+
+shed_counter = ShedCounter()
+
+
+def count_shed(level):
+    shed_counter.count(level)
+
+
+def shed_counts():
+    return shed_counter.totals()
+
+
+# One per process, so every middleware instance sees the same load.
+controller = AdmissionController(
+    max_in_flight=settings.ADMISSION_MAX_IN_FLIGHT,
+    latency=LatencyMonitor(
+        tolerance=settings.ADMISSION_LATENCY_TOLERANCE, max_frozen=settings.ADMISSION_BASELINE_FREEZE_SECONDS,
+    ),
+)
+
+
+class AdmissionMiddleware:
+    """Applies the controller to every request and times its DB queries."""
+
+    def __init__(self, get_response, admission=None):
+        self.get_response = get_response
+        self.controller = admission or controller
+
+    def __call__(self, request):
+        level = request_priority(request)
+        decision = self.controller.admit(level)
+        if decision == 'reject':
+            count_shed(level)
+            response = HttpResponse("Busy, please retry shortly.", status=503, content_type='text/plain')
+            response['Retry-After'] = '1'
+            return response
+
+        request.shed_writes = decision == 'shed'
+        if request.shed_writes:
+            count_shed(level)
+        try:
+            with connection.execute_wrapper(self.controller.time_query):
+                return self.get_response(request)
+        finally:
+            self.controller.release()
@@ -0,0 +1,251 @@
+# portfolio/cache.py
+
+import math
+import random
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from django.core.cache import cache as shared_cache
+
+from .routers import primary_reads_since
+
+# What both tiers store: the value, how long it took to compute (seconds) and
+# when it expires (epoch seconds). `delta` drives probabilistic early expiration.
+Entry = namedtuple('Entry', ['value', 'delta', 'expires_at'])
+
+
+def shared_version(key):
+    """
+    Reads a version number from the shared cache, seeding it with the current
+    time if missing. A version evicted from the backend must not come back as
+    one used before, or entries cached under it would be served again.
+    """
+    version = shared_cache.get(key)
+    if version is None:
+        seed = time.time_ns()
+        shared_cache.add(key, seed, None)
+        version = shared_cache.get(key, seed)
+    return version
+
+
+def should_refresh(entry, beta=1.0, now=None):
+    """
+    Probabilistic early expiration ("XFetch"): a reader occasionally treats an
+    entry as expired shortly before it really is, with a probability that grows
+    as expiry approaches and with how expensive the value is to recompute. One
+    request then refreshes it while everyone else is still served from cache.
+    """
+    now = time.time() if now is None else now
+    return now - entry.delta * beta * math.log(1.0 - random.random()) >= entry.expires_at
+
+
+class LocalLRU:
+    """A small thread-safe, per-process LRU of Entry objects."""
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at <= time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        with self._lock:
+            self._data[key] = entry
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesces concurrent calls for the same key into one execution per process."""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+
+class TieredCache:
+    """
+    A per-process LRU in front of Django's configured cache backend.
+
+    Misses are coalesced: within a process through SingleFlight, across
+    processes through a short-lived lock key in the shared backend, so a burst
+    of requests for a missing key runs `compute` once. Other processes serve the
+    previous value if they have one, or wait briefly for the winner's result.
+
+    Keys live in namespaces (e.g. one per tenant). `invalidate(namespace)` bumps
+    that namespace's version in the shared backend; keys embed the version, so
+    every process stops using old entries without a broadcast. Each process
+    remembers a version for `version_timeout` seconds, so a local hit makes no
+    shared-cache call; other processes pick up an invalidation within that time.
+    """
+
+    lock_timeout = 10  # seconds a recompute may hold the cross-process lock
+    poll_interval = 0.05
+
+    def __init__(self, prefix, timeout=300, local_timeout=30, local_maxsize=128, beta=1.0, version_timeout=1.0):
+        self.prefix = prefix
+        self.timeout = timeout
+        self.local_timeout = local_timeout
+        self.version_timeout = version_timeout
+        self.beta = beta
+        self.local = LocalLRU(local_maxsize)
+        self._flight = SingleFlight()
+
+    # --- Versioning ---
+    def _version_key(self, namespace):
+        return f'{self.prefix}:{namespace}:version'
+
+    def version(self, namespace=None):
+        version_key = self._version_key(namespace)
+        entry = self.local.get(version_key)
+        if entry is None:
+            entry = self._remember_version(version_key, shared_version(version_key))
+        return entry.value
+
+    def _remember_version(self, version_key, version):
+        # Kept in the local LRU beside the entries, so clearing it forgets both.
+        entry = Entry(version, 0.0, time.time() + self.version_timeout)
+        self.local.set(version_key, entry)
+        return entry
+
+    def invalidate(self, namespace=None):
+        """Drops every entry in `namespace`; other namespaces are untouched."""
+        # Local entries under the old version become unreachable and age out.
+        version_key = self._version_key(namespace)
+        version = time.time_ns()
+        shared_cache.set(version_key, version, None)
+        # This process sees its own edit at once; others within version_timeout.
+        self._remember_version(version_key, version)
+
+    def make_key(self, key, namespace=None):
+        return f'{self.prefix}:{namespace}:{self.version(namespace)}:{key}'
+
+    # --- Reads ---
+    def get_or_set(self, key, compute, timeout=None, namespace=None):
+        """Returns the cached value for `key`, calling `compute()` to fill a miss."""
+        full_key = self.make_key(key, namespace)
+
+        entry = self.local.get(full_key)
+        if entry is not None and not should_refresh(entry, self.beta):
+            return entry.value
+
+        entry = shared_cache.get(full_key)
+        if entry is not None and not should_refresh(entry, self.beta):
+            self._store_local(full_key, entry)
+            return entry.value
+
+        return self._flight.do(full_key, lambda: self._recompute(full_key, compute, timeout, stale=entry))
+
+    def _store_local(self, full_key, entry):
+        local_expiry = min(entry.expires_at, time.time() + self.local_timeout)
+        self.local.set(full_key, entry._replace(expires_at=local_expiry))
+
+    def _recompute(self, full_key, compute, timeout, stale):
+        lock_key = f'{full_key}:lock'
+        if not shared_cache.add(lock_key, 1, self.lock_timeout):
+            # Another process is recomputing; serve what we have or wait for it.
+            if stale is not None:
+                return stale.value
+            deadline = time.monotonic() + self.lock_timeout
+            while time.monotonic() < deadline:
+                time.sleep(self.poll_interval)
+                entry = shared_cache.get(full_key)
+                if entry is not None:
+                    self._store_local(full_key, entry)
+                    return entry.value
+            # The other process died or stalled; compute without the lock.
+            return self._compute_and_store(full_key, compute, timeout)
+
+        try:
+            return self._compute_and_store(full_key, compute, timeout)
+        finally:
+            shared_cache.delete(lock_key)
+
+    def _compute_and_store(self, full_key, compute, timeout):
+        timeout = self.timeout if timeout is None else timeout
+        start = time.monotonic()
+        value = compute()
+        entry = Entry(value, time.monotonic() - start, time.time() + timeout)
+        shared_cache.set(full_key, entry, timeout)
+        self._store_local(full_key, entry)
+        return value
+
+
+class VersionedMap:
+    """
+    A small table kept whole in every process's memory, for lookups on the hot
+    path that must not touch the database. `load()` builds the dict; it only
+    runs again after `invalidate()` bumps the version in the shared cache.
+    """
+
+    def __init__(self, version_key, load):
+        self.version_key = version_key
+        self._load = load
+        self._data = {}
+        self._loaded_version = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        version = shared_version(self.version_key)
+        if version != self._loaded_version:
+            with self._lock:
+                if version != self._loaded_version:
+                    # Just after a change, a replica may not have it yet.
+                    with primary_reads_since(version):
+                        self._data = self._load()
+                    self._loaded_version = version
+        return self._data
+
+    def invalidate(self):
+        shared_cache.set(self.version_key, time.time_ns(), None)
+
+
+# Rendered sections and page data for the public portfolio, namespaced by tenant id.
+portfolio_cache = TieredCache('portfolio')
@@ -0,0 +1,147 @@
+# portfolio/dimensions.py
+"""
+Interned lookup rows for ClickEvent: each distinct user agent and IP address is
+stored once and referenced by a small foreign key. Lookups are memoized per
+process with a bounded LRU, so repeat visitors cost no extra queries.
+"""
+
+import hashlib
+import ipaddress
+import re
+import threading
+from collections import OrderedDict
+
+from django.db import transaction
+
+from .models import IPAddress, UserAgent
+
+# (pattern, name) pairs, checked in order; the first match wins.
+BOT_PATTERN = re.compile(r'bot|crawl|spider|slurp|preview|monitor|headless|curl|wget|python-requests|httpclient', re.I)
+BROWSER_RULES = [
+    (re.compile(r'Edg(e|A|iOS)?/'), 'Edge'),
+    (re.compile(r'OPR/|Opera'), 'Opera'),
+    (re.compile(r'SamsungBrowser/'), 'Samsung Internet'),
+    (re.compile(r'Firefox/|FxiOS/'), 'Firefox'),
+    (re.compile(r'Chrome/|CriOS/'), 'Chrome'),
+    (re.compile(r'Safari/'), 'Safari'),
+]
+OS_RULES = [
+    (re.compile(r'Windows'), 'Windows'),
+    (re.compile(r'iPhone|iPad|iPod'), 'iOS'),
+    (re.compile(r'Android'), 'Android'),
+    (re.compile(r'CrOS'), 'ChromeOS'),
+    (re.compile(r'Mac OS X|Macintosh'), 'macOS'),
+    (re.compile(r'Linux'), 'Linux'),
+]
+TABLET_PATTERN = re.compile(r'iPad|Tablet|Android(?!.*Mobile)')
+MOBILE_PATTERN = re.compile(r'Mobi|iPhone|iPod')
+
+
+class InternedKeys:
+    """
+    A thread-safe, bounded LRU of value -> pk. A pk is only remembered once the
+    transaction that found or created its row commits, so a rollback (e.g. of
+    a serialized_write() block) can't leave a pk behind that doesn't exist.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, value):
+        with self._lock:
+            pk = self._data.get(value)
+            if pk is not None:
+                self._data.move_to_end(value)
+            return pk
+
+    def remember(self, value, pk):
+        transaction.on_commit(lambda: self._set(value, pk))
+
+    def _set(self, value, pk):
+        with self._lock:
+            self._data[value] = pk
+            self._data.move_to_end(value)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+_user_agent_keys = InternedKeys(maxsize=1024)
+_ip_keys = InternedKeys(maxsize=4096)
+
+
+def forget_interned():
+    """Drops every memoized pk; called when a UserAgent or IPAddress row is deleted."""
+    _user_agent_keys.clear()
+    _ip_keys.clear()
+
+
+def _first_match(rules, user_agent):
+    for pattern, name in rules:
+        if pattern.search(user_agent):
+            return name
+    return 'Other'
+
+
+def classify_user_agent(user_agent):
+    """Returns the browser, os, device and is_bot fields for a raw user-agent string."""
+    is_bot = bool(BOT_PATTERN.search(user_agent))
+    if is_bot:
+        device = UserAgent.BOT
+    elif TABLET_PATTERN.search(user_agent):
+        device = UserAgent.TABLET
+    elif MOBILE_PATTERN.search(user_agent):
+        device = UserAgent.MOBILE
+    else:
+        device = UserAgent.DESKTOP
+    return {
+        'browser': _first_match(BROWSER_RULES, user_agent),
+        'os': _first_match(OS_RULES, user_agent),
+        'device': device,
+        'is_bot': is_bot,
+    }
+
+
+def user_agent_hash(user_agent):
+    return hashlib.sha256(user_agent.encode('utf-8', 'surrogatepass')).hexdigest()
+
+
+def intern_user_agent(user_agent):
+    """Returns the UserAgent pk for `user_agent`, creating the row on first sight."""
+    if not user_agent:
+        return None
+    pk = _user_agent_keys.get(user_agent)
+    if pk is None:
+        agent, _ = UserAgent.objects.get_or_create(
+            ua_hash=user_agent_hash(user_agent),
+            defaults={'user_agent': user_agent, **classify_user_agent(user_agent)},
+        )
+        pk = agent.pk
+        _user_agent_keys.remember(user_agent, pk)
+    return pk
+
+
+def normalize_ip(value):
+    """Returns `value` as a canonical IP string, or None if it is not an address."""
+    try:
+        return str(ipaddress.ip_address((value or '').strip()))
+    except ValueError:
+        return None
+
+
+def intern_ip(value):
+    """Returns the IPAddress pk for `value`, or None if it is not a valid address."""
+    pk = _ip_keys.get(value)
+    if pk is None:
+        address = normalize_ip(value)
+        if address is None:
+            return None
+        ip, _ = IPAddress.objects.get_or_create(address=address)
+        pk = ip.pk
+        _ip_keys.remember(value, pk)
+    return pk
@@ -0,0 +1,59 @@
+# portfolio/engagement.py
+"""
+Time-decayed engagement scores for projects, maintained incrementally.
+
+Scores use forward decay: a click at time t adds `weight * 2 ** ((t - EPOCH) / HALF_LIFE)`
+to the stored score instead of decaying every stored score as time passes.
+All stored scores share the same scale, so ordering by the raw column gives the
+same ranking as the decayed values, and ingesting a click is a single
+`UPDATE ... SET engagement_score = engagement_score + x`. Divide by
+`decay_factor(now)` to read a score in "recent clicks" units.
+
+With a 30-day half-life the stored values stay well inside float range for
+several decades after EPOCH.
+"""
+
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Project
+
+EPOCH = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+HALF_LIFE = timedelta(days=30)
+
+# How much each tracked action counts towards a project's score.
+CLICK_WEIGHTS = {
+    'PROJECT_LIVE_DEMO': 1.0,
+    'PROJECT_GITHUB': 1.0,
+}
+
+# Number of projects shown under the "Most Popular" filter.
+POPULAR_LIMIT = 6
+
+
+def decay_factor(when=None):
+    when = when or timezone.now()
+    return 2 ** ((when - EPOCH) / HALF_LIFE)
+
+
+def record_click(project_id, action, when=None):
+    """Adds one click to the project's stored score; other actions are ignored."""
+    weight = CLICK_WEIGHTS.get(action)
+    if weight is None or project_id is None:
+        return
+    Project.objects.filter(pk=project_id).update(
+        engagement_score=F('engagement_score') + weight * decay_factor(when)
+    )
+
+
+def current_score(project, now=None):
+    """The project's score decayed to `now`, roughly "clicks in the last half-life"."""
+    return project.engagement_score / decay_factor(now)
+
+
+def popular_ranks(tenant, limit=POPULAR_LIMIT):
+    """Maps project pk -> 1-based rank for `tenant`'s most engaged projects, read from the score index."""
+    top = Project.objects.filter(tenant=tenant).popular().filter(engagement_score__gt=0).values_list('pk', flat=True)[:limit]
+    return {pk: rank for rank, pk in enumerate(top, start=1)}
@@ -0,0 +1,111 @@
+# portfolio/log.py
+"""
+Logging plumbing, configured through LOGGING in settings.py:
+
+- QueueStreamHandler hands records to a background thread, so formatting and
+  stream I/O never happen on the request thread.
+- JsonFormatter writes one JSON object per line, including any `extra=` fields.
+- SampleFilter keeps only a fraction of the INFO/DEBUG records of a noisy logger.
+
+Log with %-style arguments (`logger.info("Saved %s", name)`), not f-strings, so
+the message is only built for records that are actually emitted.
+"""
+
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import random
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+# Attributes every LogRecord has; anything else on a record came from `extra=`.
+RESERVED_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        payload = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        payload.update((key, value) for key, value in vars(record).items() if key not in RESERVED_ATTRS)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload['exception'] = record.exc_text
+        return json.dumps(payload, default=str)
+
+
+class QueueStreamHandler(QueueHandler):
+    """
+    Queues records for a QueueListener thread that formats and writes them to
+    `stream`. When the queue is full, records are dropped rather than blocking
+    the request; `dropped` counts them, and close() logs the total.
+    """
+
+    def __init__(self, stream=None, maxsize=10000):
+        super().__init__(queue.Queue(maxsize))
+        self.target = logging.StreamHandler(stream)
+        self._start_listener()
+        atexit.register(self.close)
+        # A forked worker (e.g. gunicorn --preload) doesn't inherit the thread.
+        os.register_at_fork(after_in_child=self._start_listener)
+
+    def _start_listener(self):
+        self.queue = queue.Queue(self.queue.maxsize)
+        self.dropped = 0
+        self.listener = QueueListener(self.queue, self.target)
+        self.listener.start()
+
+    def setFormatter(self, fmt):
+        # Formatting happens on the listener thread.
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        # The record is only read in this process, so skip QueueHandler's eager
+        # formatting; just render a traceback now, before its frames change.
+        # Other handlers still get the record as logged.
+        if record.exc_info:
+            record = copy.copy(record)
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self):
+        if self.listener._thread is not None:
+            self.listener.stop()  # Drains what's queued
+        if self.dropped:
+            self.target.handle(logging.LogRecord(
+                __name__, logging.WARNING, __file__, 0,
+                "Dropped %d log records because the queue was full", (self.dropped,), None,
+            ))
+            self.dropped = 0
+        super().close()
+
+
+class SampleFilter(logging.Filter):
+    """Passes `rate` of the records below WARNING; warnings and errors always pass."""
+
+    def __init__(self, rate=1.0):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        if random.random() >= self.rate:
+            return False
+        record.sample_rate = self.rate  # Lets log queries scale counts back up
+        return True
+
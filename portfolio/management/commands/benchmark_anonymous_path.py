@@ -0,0 +1,109 @@
+# portfolio/management/commands/benchmark_anonymous_path.py
+
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib import messages
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.http import HttpRequest, HttpResponse
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext, setup_databases, teardown_databases
+from django.urls import reverse
+from django.utils.crypto import get_random_string
+
+# Django's stock classes, as the stack ran before the anonymous fast path.
+STOCK_MIDDLEWARE = {
+    'portfolio.middleware.PublicSessionMiddleware': 'django.contrib.sessions.middleware.SessionMiddleware',
+    'portfolio.middleware.PublicAuthenticationMiddleware': 'django.contrib.auth.middleware.AuthenticationMiddleware',
+}
+
+
+def anonymous_visit(client):
+    """One anonymous visit: a rejected contact POST, the page showing the error, then the sections."""
+    client.post(reverse('portfolio'), {'name': '', 'email': 'not-an-email', 'subject': '', 'message': ''})
+    client.get(reverse('portfolio'))
+    client.get(reverse('portfolio_section', args=['skills']))
+    client.get(reverse('portfolio_section', args=['projects']))
+    return 4
+
+
+def session_cookies(spilled_message=False):
+    """
+    Cookies of a returning visitor whose browser still holds a stored session.
+    With `spilled_message`, a flash message too big for the messages cookie
+    waits in that session, as the stock FallbackStorage leaves it.
+    """
+    request = HttpRequest()
+    request.session = import_module(settings.SESSION_ENGINE).SessionStore()
+    request.session['returning'] = True
+    response = HttpResponse()
+    if spilled_message:
+        storage = FallbackStorage(request)
+        storage.add(messages.INFO, get_random_string(4096))  # The cookie is compressed; this isn't
+        storage.update(response)
+    request.session.save()
+    cookies = {settings.SESSION_COOKIE_NAME: request.session.session_key}
+    cookies.update((name, morsel.value) for name, morsel in response.cookies.items())
+    return cookies
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares DB queries and time per anonymous request with and without the session-free path, "
+        "for first-time and returning visitors, on a throwaway test database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--visits', type=int, default=50)
+
+    def measure(self, visits, cookies):
+        requests = 0
+        start = time.perf_counter()
+        with CaptureQueriesContext(connection) as queries:
+            for _ in range(visits):
+                # A fresh client per visit, carrying only the visitor's cookies.
+                client = Client(HTTP_HOST='localhost')
+                for name, value in cookies.items():
+                    client.cookies[name] = value
+                requests += anonymous_visit(client)
+        elapsed = time.perf_counter() - start
+        session_queries = sum('django_session' in q['sql'] for q in queries.captured_queries)
+        return len(queries) / requests, session_queries / requests, elapsed * 1000 / requests
+
+    def handle(self, *args, **options):
+        old_config = setup_databases(verbosity=0, interactive=False, serialized_aliases=set())
+        try:
+            results = self.run_benchmark(options['visits'])
+        finally:
+            teardown_databases(old_config, verbosity=0)
+
+        self.stdout.write(f"{'':30}{'queries/req':>12}{'session q/req':>15}{'ms/req':>9}")
+        for visitor, runs in results.items():
+            self.stdout.write(visitor)
+            for label, (queries, session_queries, ms) in runs.items():
+                self.stdout.write(f"  {label:28}{queries:12.2f}{session_queries:15.2f}{ms:9.2f}")
+        self.stdout.write("\nQueries removed per anonymous request:")
+        for visitor, runs in results.items():
+            self.stdout.write(f"  {visitor}: {runs['stock'][0] - runs['session-free'][0]:.2f}")
+
+    def run_benchmark(self, visits):
+        anonymous_visit(Client(HTTP_HOST='localhost'))  # Warm the caches for every run
+        stock_settings = override_settings(
+            MIDDLEWARE=[STOCK_MIDDLEWARE.get(entry, entry) for entry in settings.MIDDLEWARE],
+            MESSAGE_STORAGE='django.contrib.messages.storage.fallback.FallbackStorage',
+        )
+        visitors = {
+            'first-time visitor': lambda: {},
+            'with a session cookie': session_cookies,
+            # {% if messages %} makes the stock FallbackStorage read the session.
+            'with a message in the session': lambda: session_cookies(spilled_message=True),
+        }
+        results = {}
+        for visitor, cookies in visitors.items():
+            with stock_settings:
+                stock = self.measure(visits, cookies())
+            results[visitor] = {'stock': stock, 'session-free': self.measure(visits, cookies())}
+        return results
@@ -0,0 +1,158 @@
+# portfolio/management/commands/benchmark_database.py
+
+import multiprocessing
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from contextlib import nullcontext
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections
+from django.test.utils import setup_databases, teardown_databases
+
+from portfolio.dimensions import intern_ip, intern_user_agent
+from portfolio.engagement import popular_ranks, record_click
+from portfolio.models import ClickEvent, Project, Tenant
+from portfolio.sqlite import serialized_write
+
+USER_AGENT = 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/130.0 Safari/537.36'
+
+
+def read_page(tenant):
+    # The queries behind an uncached portfolio page's projects grid.
+    popular_ranks(tenant)
+    list(Project.objects.filter(tenant=tenant).for_grid())
+
+
+def write_click(tenant, project_ids, serialize):
+    # What track_click writes for one project click.
+    project_id = random.choice(project_ids)
+    with serialized_write() if serialize else nullcontext():
+        ClickEvent.objects.create(
+            tenant=tenant, action_type='PROJECT_GITHUB', project_id=project_id,
+            ip_id=intern_ip('203.0.113.7'), agent_id=intern_user_agent(USER_AGENT),
+        )
+        record_click(project_id, 'PROJECT_GITHUB')
+
+
+def run_worker(options, results):
+    """One worker process: `threads` threads issuing reads and writes until the deadline."""
+    tenant = Tenant.objects.get(slug='default')
+    project_ids = list(Project.objects.filter(tenant=tenant).values_list('pk', flat=True))
+    deadline = time.monotonic() + options['seconds']
+    counts = {'reads': 0, 'writes': 0, 'locked': 0}
+    write_ms = []
+    lock = threading.Lock()
+
+    def client():
+        while time.monotonic() < deadline:
+            is_write = random.random() < options['write_share']
+            start = time.perf_counter()
+            try:
+                if is_write:
+                    write_click(tenant, project_ids, not options['no_serialize'])
+                else:
+                    read_page(tenant)
+            except OperationalError:
+                with lock:
+                    counts['locked'] += 1
+                continue
+            elapsed = (time.perf_counter() - start) * 1000
+            with lock:
+                counts['writes' if is_write else 'reads'] += 1
+                if is_write:
+                    write_ms.append(elapsed)
+        connection.close()
+
+    threads = [threading.Thread(target=client) for _ in range(options['threads'])]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    results.put((counts, write_ms))
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures read and click-write throughput of the configured database with concurrent worker "
+        "processes, on a throwaway test database. Run it once per DATABASE_URL to compare, e.g. the "
+        "SQLite profile against a local Postgres (which needs permission to create the test database)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help="Worker processes, like gunicorn --workers.")
+        parser.add_argument('--threads', type=int, default=2, help="Threads per worker, like gunicorn --threads.")
+        parser.add_argument('--seconds', type=float, default=5.0)
+        parser.add_argument('--write-share', type=float, default=0.3, help="Fraction of operations that are clicks.")
+        parser.add_argument('--projects', type=int, default=30)
+        parser.add_argument(
+            '--no-serialize', action='store_true',
+            help="Write without serialized_write(): separate autocommit statements, no process lock.",
+        )
+
+    def handle(self, *args, **options):
+        test_settings = connection.settings_dict.setdefault('TEST', {})
+        temp_dir = None
+        if connection.vendor == 'sqlite' and not test_settings.get('NAME'):
+            # Worker processes can't share the default in-memory test database.
+            temp_dir = tempfile.TemporaryDirectory()
+            test_settings['NAME'] = os.path.join(temp_dir.name, 'benchmark.sqlite3')
+
+        old_config = setup_databases(verbosity=0, interactive=False, serialized_aliases=set())
+        try:
+            tenant = Tenant.objects.get(slug='default')
+            Project.objects.bulk_create(
+                Project(tenant=tenant, title=f"Project {i}", description="-", image='benchmark.png')
+                for i in range(options['projects'])
+            )
+            self.stdout.write(self.describe_database())
+            counts, write_ms = self.run_workers(options)
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            if temp_dir is not None:
+                temp_dir.cleanup()
+
+        seconds = options['seconds']
+        self.stdout.write(
+            f"{options['workers']} workers x {options['threads']} threads, {seconds:g} s, "
+            f"{options['write_share']:.0%} writes{' (unserialized)' if options['no_serialize'] else ''}"
+        )
+        self.stdout.write(f"  page reads:   {counts['reads'] / seconds:8.0f} /s")
+        self.stdout.write(f"  click writes: {counts['writes'] / seconds:8.0f} /s")
+        if len(write_ms) >= 2:
+            p95 = statistics.quantiles(write_ms, n=20)[-1]
+            self.stdout.write(f"  write latency: median {statistics.median(write_ms):.1f} ms, p95 {p95:.1f} ms")
+        if counts['locked']:
+            raise CommandError(f"{counts['locked']} operations failed with a database error (e.g. locked).")
+
+    def describe_database(self):
+        if connection.vendor != 'sqlite':
+            return f"{connection.vendor} {connection.settings_dict['NAME']}"
+        with connection.cursor() as cursor:
+            pragmas = []
+            for pragma in ('journal_mode', 'synchronous', 'mmap_size', 'cache_size'):
+                cursor.execute(f'PRAGMA {pragma}')
+                pragmas.append(f"{pragma}={cursor.fetchone()[0]}")
+        return f"sqlite ({', '.join(pragmas)}, transaction_mode={connection.transaction_mode})"
+
+    def run_workers(self, options):
+        # Children open their own connections; none may be inherited across fork.
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        results = context.Queue()
+        workers = [context.Process(target=run_worker, args=(options, results)) for _ in range(options['workers'])]
+        for worker in workers:
+            worker.start()
+        totals = {'reads': 0, 'writes': 0, 'locked': 0}
+        write_ms = []
+        for _ in workers:
+            counts, latencies = results.get()
+            for key, value in counts.items():
+                totals[key] += value
+            write_ms.extend(latencies)
+        for worker in workers:
+            worker.join()
+        return totals, write_ms
@@ -0,0 +1,90 @@
+# portfolio/management/commands/benchmark_logging.py
+
+import logging
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from portfolio.log import JsonFormatter, QueueStreamHandler, SampleFilter
+
+VERBOSE = logging.Formatter('{levelname} {asctime} {module} {message}', style='{')
+
+
+class SlowStream:
+    """A stream whose writes take `latency` seconds, like a blocked stdout pipe."""
+
+    def __init__(self, stream, latency):
+        self.stream = stream
+        self.latency = latency
+
+    def write(self, data):
+        if self.latency:
+            time.sleep(self.latency)
+        return self.stream.write(data)
+
+    def flush(self):
+        self.stream.flush()
+
+
+def make_logger(name, handler, formatter, sample_rate=None):
+    handler.setFormatter(formatter)
+    logger = logging.getLogger(f'benchmark.{name}')
+    logger.handlers = [handler]
+    logger.filters = [SampleFilter(sample_rate)] if sample_rate is not None else []
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    return logger
+
+
+def log_click_fstring(logger, action, details, ip):
+    # The tracking log line as track_click wrote it before.
+    logger.info(f"Tracking click event. Action: {action}, Details: {details}, IP: {ip}")
+
+
+def log_click_lazy(logger, action, details, ip):
+    logger.info(
+        "Tracking click event. Action: %s, Details: %s", action, details,
+        extra={'event': 'click', 'action': action, 'ip': ip},
+    )
+
+
+class Command(BaseCommand):
+    help = "Measures the request-thread cost of the click-tracking log line under each logging setup."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=20000)
+        parser.add_argument(
+            '--write-latency-us', type=float, default=50.0,
+            help="Simulated latency of each write to the log stream (0 for a fast stream).",
+        )
+
+    def handle(self, *args, **options):
+        requests = options['requests']
+        devnull = open(os.devnull, 'w')
+        stream = SlowStream(devnull, options['write_latency_us'] / 1_000_000)
+        queued = [QueueStreamHandler(stream, maxsize=requests + 1) for _ in range(2)]
+
+        setups = (
+            ('f-string, sync StreamHandler', log_click_fstring,
+             make_logger('sync', logging.StreamHandler(stream), VERBOSE)),
+            ('%-style + extra, queued JSON', log_click_lazy,
+             make_logger('queued', queued[0], JsonFormatter())),
+            ('... sampled at 10%', log_click_lazy,
+             make_logger('sampled', queued[1], JsonFormatter(), sample_rate=0.1)),
+        )
+
+        self.stdout.write(f"{requests} click requests, {options['write_latency_us']:g} µs per stream write\n")
+        self.stdout.write(f"{'setup':32}{'µs/request':>12}")
+        for label, log_click, logger in setups:
+            start = time.perf_counter()
+            for i in range(requests):
+                log_click(logger, 'PROJECT_GITHUB', i, '203.0.113.7')
+            per_request = (time.perf_counter() - start) * 1_000_000 / requests
+            self.stdout.write(f"{label:32}{per_request:12.2f}")
+
+        for handler in queued:
+            handler.close()  # Waits for the listener to drain
+            if handler.dropped:
+                self.stdout.write(f"({handler.dropped} records dropped by a full queue)")
+        devnull.close()
@@ -0,0 +1,88 @@
+# portfolio/management/commands/check_admin_queries.py
+
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from portfolio.models import Tenant
+
+
+def changelist_request(model_admin, tenant):
+    opts = model_admin.model._meta
+    request = RequestFactory().get(f'/admin/{opts.app_label}/{opts.model_name}/')
+    # An unsaved active superuser passes every permission check without queries.
+    request.user = get_user_model()(is_active=True, is_staff=True, is_superuser=True)
+    request.tenant = tenant
+    return request
+
+
+def count_changelist_queries(model_admin, per_page, tenant):
+    """Renders `model_admin`'s changelist for `tenant` with `per_page` rows and returns the query count."""
+    request = changelist_request(model_admin, tenant)
+    original_per_page = model_admin.list_per_page
+    model_admin.list_per_page = per_page
+    try:
+        with CaptureQueriesContext(connection) as queries:
+            model_admin.changelist_view(request).render()
+    finally:
+        model_admin.list_per_page = original_per_page
+    return len(queries)
+
+
+def changelist_rows(model_admin, tenant):
+    """How many rows `model_admin`'s changelist lists for `tenant`."""
+    return model_admin.get_queryset(changelist_request(model_admin, tenant)).count()
+
+
+def find_changelist_n_plus_one(tenant, site=admin.site, small=1, large=100):
+    """
+    Returns (model_admin, small_count, large_count) for every registered
+    changelist whose query count grows with the page size. Only changelists
+    listing more than `small` rows can show a difference; see changelist_rows().
+    """
+    offenders = []
+    for model_admin in site._registry.values():
+        small_count = count_changelist_queries(model_admin, small, tenant)
+        large_count = count_changelist_queries(model_admin, large, tenant)
+        if large_count > small_count:
+            offenders.append((model_admin, small_count, large_count))
+    return offenders
+
+
+class Command(BaseCommand):
+    help = (
+        "Fails if any admin changelist issues more queries as its page size grows (N+1). Only "
+        "changelists with more rows than --small are checked; portfolio.tests seeds a full dataset."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--small', type=int, default=1, help="Rows on the baseline page.")
+        parser.add_argument('--large', type=int, default=100, help="Rows on the comparison page.")
+        parser.add_argument('--tenant', help="Slug of the tenant whose rows are listed (default: the first one).")
+
+    def handle(self, *args, **options):
+        tenants = Tenant.objects.order_by('pk')
+        tenant = tenants.filter(slug=options['tenant']).first() if options['tenant'] else tenants.first()
+        if tenant is None:
+            raise CommandError("No matching tenant.")
+        unchecked = [
+            model_admin for model_admin in admin.site._registry.values()
+            if changelist_rows(model_admin, tenant) <= options['small']
+        ]
+        offenders = find_changelist_n_plus_one(tenant, small=options['small'], large=options['large'])
+        for model_admin, small_count, large_count in offenders:
+            self.stderr.write(
+                f"{model_admin}: {small_count} queries for {options['small']} rows, "
+                f"{large_count} for {options['large']} rows"
+            )
+        if offenders:
+            raise CommandError(f"{len(offenders)} changelist(s) scale their queries with page size.")
+        checked = len(admin.site._registry) - len(unchecked)
+        if unchecked:
+            self.stdout.write(self.style.WARNING(
+                f"Not checked, {options['small']} row(s) or fewer: {', '.join(model_admin.model._meta.label for model_admin in unchecked)}"
+            ))
+        self.stdout.write(self.style.SUCCESS(f"{checked} changelist(s) checked use a constant number of queries."))
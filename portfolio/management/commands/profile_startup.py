@@ -0,0 +1,69 @@
+# portfolio/management/commands/profile_startup.py
+
+import os
+import re
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# One line of `python -X importtime` output: "import time: self | cumulative | name"
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+# Imports the WSGI entry point in a fresh interpreter and prints the wall time.
+BOOT_SCRIPT = (
+    "import time; start = time.perf_counter(); "
+    "import {module}; "
+    "print(round((time.perf_counter() - start) * 1000, 1))"
+)
+
+
+def profile_cold_start(module):
+    """
+    Imports `module` in a fresh interpreter with `-X importtime` and returns
+    (total_ms, rows), where each row is (module_name, self_ms, cumulative_ms, depth).
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', BOOT_SCRIPT.format(module=module)],
+        capture_output=True, text=True, env=os.environ.copy(), cwd=settings.BASE_DIR,
+    )
+    if result.returncode != 0:
+        raise CommandError(f"Importing '{module}' failed:\n{result.stderr[-2000:]}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((name, int(self_us) / 1000, int(cumulative_us) / 1000, len(indent) // 2))
+    return float(result.stdout.strip().splitlines()[-1]), rows
+
+
+class Command(BaseCommand):
+    help = "Reports per-module import time for a cold start of the WSGI entry point."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=25, help="Number of modules to list.")
+        parser.add_argument(
+            '--sort', choices=['cumulative', 'self'], default='cumulative',
+            help="Rank modules by time including (cumulative) or excluding (self) their imports.",
+        )
+        parser.add_argument(
+            '--budget-ms', type=float, default=None,
+            help="Exit with an error if the cold start takes longer than this.",
+        )
+
+    def handle(self, *args, **options):
+        module = settings.WSGI_APPLICATION.rsplit('.', 1)[0]
+        total_ms, rows = profile_cold_start(module)
+
+        key = 2 if options['sort'] == 'cumulative' else 1
+        self.stdout.write(f"{'self ms':>9} {'cumul ms':>9}  module")
+        for name, self_ms, cumulative_ms, depth in sorted(rows, key=lambda row: row[key], reverse=True)[:options['top']]:
+            self.stdout.write(f"{self_ms:9.1f} {cumulative_ms:9.1f}  {name}")
+        self.stdout.write(f"\nImporting {module} took {total_ms:.1f} ms ({len(rows)} modules).")
+
+        budget = options['budget_ms']
+        if budget is not None and total_ms > budget:
+            raise CommandError(f"Cold start of {total_ms:.1f} ms exceeds the {budget:.1f} ms budget.")
@@ -0,0 +1,29 @@
+# portfolio/management/commands/run_worker.py
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from portfolio.tasks import run_pending
+
+
+class Command(BaseCommand):
+    help = "Runs queued background tasks (uploads, notification emails) until stopped."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Drain the due tasks once and exit.")
+        parser.add_argument('--batch', type=int, default=10, help="Tasks claimed per poll.")
+        parser.add_argument('--sleep', type=float, default=2.0, help="Seconds to wait when the queue is empty.")
+
+    def handle(self, *args, **options):
+        self.stdout.write("Task worker started.")
+        try:
+            while True:
+                executed = run_pending(limit=options['batch'])
+                if options['once'] and not executed:
+                    break
+                if not executed:
+                    time.sleep(options['sleep'])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write("Task worker stopped.")
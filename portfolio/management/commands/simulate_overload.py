@@ -0,0 +1,137 @@
+# portfolio/management/commands/simulate_overload.py
+
+import random
+import statistics
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from portfolio.admission import NORMAL, PAGE, TRACKING, AdmissionController, AdmissionMiddleware, LatencyMonitor
+
+factory = RequestFactory()
+
+# One request of each priority class, as the real URLconf classifies them.
+REQUESTS = {
+    PAGE: lambda: factory.get('/'),
+    TRACKING: lambda: factory.get('/track_click/', {'action': 'EMAIL_CLICK'}),
+    NORMAL: lambda: factory.post('/', {'name': 'Load', 'email': 'load@example.com', 'subject': '-', 'message': '-'}),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Drives the admission middleware with synthetic requests under light load, a concurrency "
+        "burst, a slow database and a lasting slowdown, and reports what was admitted, shed or rejected."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=32, help="Concurrent clients during the burst.")
+        parser.add_argument('--requests', type=int, default=40, help="Requests per client and phase.")
+        parser.add_argument('--max-in-flight', type=int, default=8)
+        parser.add_argument('--service-ms', type=float, default=5.0, help="Time a request spends in the view.")
+        parser.add_argument('--db-ms', type=float, default=1.0, help="Healthy query latency.")
+        parser.add_argument('--slow-db-ms', type=float, default=25.0, help="Query latency in the slow phase.")
+        parser.add_argument(
+            '--step-db-ms', type=float, nargs=2, default=[3.0, 8.0], metavar=('BEFORE', 'AFTER'),
+            help="Query latency before and after a lasting slowdown.",
+        )
+        parser.add_argument(
+            '--baseline-freeze-ms', type=float, default=100.0,
+            help="How long the lasting-slowdown run keeps its latency baseline frozen.",
+        )
+
+    def handle(self, *args, **options):
+        db_seconds = [options['db_ms'] / 1000]
+
+        def middleware_for(controller, jitter):
+            def view(request):
+                # Stands in for the real views: some DB time, then rendering.
+                controller.latency.observe(db_seconds[0] * random.uniform(1 - jitter, 1 + jitter))
+                time.sleep(options['service_ms'] / 1000)
+                return HttpResponse()
+            return AdmissionMiddleware(view, admission=controller)
+
+        light = max(options['max_in_flight'] // 4, 1)
+        before, after = options['step_db_ms']
+        runs = (
+            (LatencyMonitor(), 0.5, (
+                ('light load', light, options['db_ms']),
+                ('burst', options['threads'], options['db_ms']),
+                ('slow db, light load', light, options['slow_db_ms']),
+            )),
+            # A steady slowdown that lasts (a grown table, a smaller instance)
+            # is shed at first, then accepted as the new normal.
+            (LatencyMonitor(max_frozen=options['baseline_freeze_ms'] / 1000), 0.1, (
+                ('step, before', light, before),
+                ('step, after', light, after),
+                ('step, settling', light, after),
+                ('step, settled', light, after),
+            )),
+        )
+        results = {}
+        for monitor, jitter, phases in runs:
+            middleware = middleware_for(AdmissionController(options['max_in_flight'], monitor), jitter)
+            for phase, threads, db_ms in phases:
+                db_seconds[0] = db_ms / 1000
+                outcomes, page_ms = self.run_phase(middleware, threads, options['requests'])
+                self.report(f"{phase} ({threads} clients, {db_ms:g} ms queries)", outcomes, page_ms)
+                results[phase] = outcomes
+
+        if any(outcomes[PAGE]['rejected'] for outcomes in results.values()):
+            raise CommandError("Page views were rejected.")
+        for phase in ('light load', 'step, before'):
+            if sum(results[phase][level]['shed'] + results[phase][level]['rejected'] for level in REQUESTS):
+                raise CommandError(f"Requests were shed under {phase}.")
+        if not all(results[phase][TRACKING]['shed'] for phase in ('burst', 'slow db, light load', 'step, after')):
+            raise CommandError("Tracking writes were not shed under overload.")
+        if results['step, settled'][TRACKING]['shed']:
+            raise CommandError("Tracking writes were still shed after a lasting slowdown became the new normal.")
+        self.stdout.write(self.style.SUCCESS(
+            "\nPage views were never rejected; tracking writes were shed first, until a lasting slowdown settled."
+        ))
+
+    def run_phase(self, middleware, threads, requests):
+        outcomes = defaultdict(Counter)
+        page_ms = []
+        lock = threading.Lock()
+        start_line = threading.Barrier(threads)
+
+        def client():
+            start_line.wait()
+            for _ in range(requests):
+                level = random.choices((PAGE, TRACKING, NORMAL), weights=(5, 4, 1))[0]
+                request = REQUESTS[level]()
+                start = time.perf_counter()
+                response = middleware(request)
+                elapsed = (time.perf_counter() - start) * 1000
+                if response.status_code == 503:
+                    outcome = 'rejected'
+                elif getattr(request, 'shed_writes', False):
+                    outcome = 'shed'
+                else:
+                    outcome = 'admitted'
+                with lock:
+                    outcomes[level][outcome] += 1
+                    if level == PAGE:
+                        page_ms.append(elapsed)
+
+        workers = [threading.Thread(target=client) for _ in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        return outcomes, page_ms
+
+    def report(self, phase, outcomes, page_ms):
+        self.stdout.write(f"\n{phase}")
+        self.stdout.write(f"  {'class':10}{'admitted':>10}{'shed':>8}{'rejected':>10}")
+        for level in (PAGE, NORMAL, TRACKING):
+            counts = outcomes[level]
+            self.stdout.write(f"  {level:10}{counts['admitted']:10}{counts['shed']:8}{counts['rejected']:10}")
+        if page_ms:
+            p95 = statistics.quantiles(page_ms, n=20)[-1]
+            self.stdout.write(f"  page view latency: median {statistics.median(page_ms):.1f} ms, p95 {p95:.1f} ms")
@@ -0,0 +1,226 @@
+# portfolio/management/commands/soak.py
+
+import gc
+import linecache
+import logging
+import os
+import random
+import resource
+import time
+import tracemalloc
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, RequestFactory, override_settings
+from django.middleware.csrf import CSRF_SECRET_LENGTH
+from django.test.utils import setup_databases, teardown_databases
+from django.utils.crypto import get_random_string
+
+from portfolio.models import GeneralInfo, Project, ProjectCategory, Tag, Tenant
+from portfolio.shortlinks import invalidate_link_map, project_link_codes
+from portfolio.tenants import invalidate_host_map
+
+# Media stays in memory rather than going to Cloudinary, and static URLs
+# don't need a collectstatic manifest.
+SOAK_STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.InMemoryStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+# Allocations made by the measurement itself, not by the code under test.
+IGNORED_FRAMES = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, linecache.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+)
+
+
+def rss_bytes():
+    """Current resident set size; falls back to the peak where /proc isn't available."""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024  # KiB on Linux
+
+
+def seed(projects):
+    """Gives the default tenant (created by migration 0011) a page worth rendering."""
+    tenant = Tenant.objects.get(slug='default')
+    GeneralInfo.objects.create(tenant=tenant, name="Soak Owner")
+    categories = ProjectCategory.objects.bulk_create(
+        ProjectCategory(tenant=tenant, name=f"Category {i}", slug=f"category-{i}") for i in range(3)
+    )
+    tags = Tag.objects.bulk_create(Tag(tenant=tenant, name=f"tag-{i}") for i in range(5))
+    for i in range(projects):
+        # Saved one by one so the post_save signal creates their short links.
+        project = Project.objects.create(
+            tenant=tenant, title=f"Project {i}", description="-", image='soak.png', is_featured=i < 3,
+            github_link=f"https://github.com/example/project-{i}", live_demo_link=f"https://example.com/{i}/",
+        )
+        project.categories.add(categories[i % len(categories)])
+        project.tags.add(*tags[:i % len(tags) + 1])
+    get_user_model().objects.create_superuser('soak', 'soak@example.com', 'soak')
+    return tenant
+
+
+def wsgi_sender(handler, factory, method, path, data=None):
+    """Returns a callable that sends one request through `handler` and returns its status code."""
+    def send():
+        # Build the environ per request; its body stream can only be read once.
+        environ = getattr(factory, method)(path() if callable(path) else path, data).environ
+        status = []
+        response = handler(environ, lambda line, headers, exc_info=None: status.append(line))
+        b''.join(response)
+        response.close()  # Fires request_finished, as the server would
+        return int(status[0].split()[0])
+    return send
+
+
+def endpoints(tenant):
+    """Maps endpoint name -> (callable sending one request, the status it must answer with)."""
+    # Requests go straight to a WSGIHandler: django.test.Client reconnects
+    # signal receivers on every request, which itself grows memory.
+    handler = WSGIHandler()
+    factory = RequestFactory(HTTP_HOST='localhost')
+    # The browser's CSRF cookie and the header script.js sends with it.
+    token = get_random_string(CSRF_SECRET_LENGTH)
+    anonymous_post = RequestFactory(
+        HTTP_HOST='localhost', HTTP_COOKIE=f'{settings.CSRF_COOKIE_NAME}={token}', HTTP_X_CSRFTOKEN=token,
+    )
+    login = Client()
+    login.force_login(get_user_model().objects.get(username='soak'))
+    session = login.cookies[settings.SESSION_COOKIE_NAME].value
+    staff = RequestFactory(HTTP_HOST='localhost', HTTP_COOKIE=f'{settings.SESSION_COOKIE_NAME}={session}')
+
+    project_ids = list(Project.objects.filter(tenant=tenant).values_list('pk', flat=True))
+    codes = list(project_link_codes(tenant.pk).values())
+    contact = {'name': "Soak", 'email': 'soak@example.com', 'subject': "Hello", 'message': "Just soaking."}
+    return {
+        'page': (wsgi_sender(handler, factory, 'get', '/'), 200),
+        'section': (wsgi_sender(handler, factory, 'get', '/section/projects/'), 200),
+        'track_click': (wsgi_sender(
+            handler, factory, 'get', lambda: f'/track_click/?action=PROJECT_GITHUB&details={random.choice(project_ids)}',
+        ), 204),
+        'short_link': (wsgi_sender(handler, factory, 'get', lambda: f'/go/{random.choice(codes)}/'), 302),
+        'contact': (wsgi_sender(handler, anonymous_post, 'post', '/contact/', contact), 201),
+        'admin': (wsgi_sender(handler, staff, 'get', '/admin/portfolio/project/'), 200),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Drives many in-process requests per endpoint against a seeded throwaway database, tracks "
+        "traced allocations and RSS, and fails if memory keeps growing per request."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000, help="Measured requests per endpoint.")
+        parser.add_argument('--warmup', type=int, default=200, help="Unmeasured requests first, to fill caches.")
+        parser.add_argument('--interval', type=int, default=500, help="Requests between snapshots.")
+        parser.add_argument('--top', type=int, default=5, help="Allocation sites listed per endpoint.")
+        parser.add_argument('--frames', type=int, default=1, help="Frames tracemalloc keeps per allocation.")
+        parser.add_argument('--projects', type=int, default=12)
+        parser.add_argument(
+            '--max-bytes-per-request', type=float, default=64.0,
+            help="Fail when traced memory grows by more than this per request.",
+        )
+        parser.add_argument(
+            '--max-rss-per-request', type=float, default=1024.0,
+            help="Fail when RSS grows by more than this per request.",
+        )
+
+    @override_settings(ALLOWED_HOSTS=['*'], DEBUG=False, STORAGES=SOAK_STORAGES)
+    def handle(self, *args, **options):
+        if options['requests'] < 2 * options['interval']:
+            raise CommandError("--requests must cover at least two --interval snapshots.")
+        old_config = setup_databases(verbosity=0, interactive=False, serialized_aliases=set())
+        invalidate_host_map()
+        invalidate_link_map()
+        # Request logging would flood the output; a leak in it would still show
+        # under WARNING-level records, which stay enabled.
+        logging.disable(logging.INFO)
+        try:
+            tenant = seed(options['projects'])
+            self.run_soak(endpoints(tenant), options)
+        finally:
+            logging.disable(logging.NOTSET)
+            teardown_databases(old_config, verbosity=0)
+            invalidate_host_map()
+            invalidate_link_map()
+
+    def run_soak(self, endpoints, options):
+        mix = {'page': 40, 'section': 10, 'track_click': 25, 'short_link': 10, 'contact': 5, 'admin': 10}
+
+        def mixed():
+            # Roughly the production mix: mostly page views and clicks.
+            name = random.choices(list(mix), weights=list(mix.values()))[0]
+            return endpoints[name][0]()
+
+        sends = {**endpoints, 'mixed': (mixed, None)}
+        tracemalloc.start(options['frames'])
+        failures = []
+        try:
+            for name, (send, status) in sends.items():
+                traced, rss = self.soak_endpoint(name, send, status, options)
+                if traced > options['max_bytes_per_request']:
+                    failures.append(f"{name}: {traced:.1f} traced bytes/request")
+                if rss > options['max_rss_per_request']:
+                    failures.append(f"{name}: {rss:.1f} RSS bytes/request")
+        finally:
+            tracemalloc.stop()
+
+        if failures:
+            raise CommandError("Memory grew past the threshold:\n  " + "\n  ".join(failures))
+        self.stdout.write(self.style.SUCCESS("\nNo endpoint grew past the per-request thresholds."))
+
+    def soak_endpoint(self, name, send, status, options):
+        """
+        Returns (traced bytes, RSS bytes) of growth per request, measured from
+        the first snapshot interval to the last so caches filling up early
+        don't count as a leak.
+        """
+        def request():
+            answered = send()
+            if status is not None and answered != status:
+                raise CommandError(f"{name} answered {answered}, expected {status}.")
+
+        for _ in range(options['warmup']):
+            request()
+        gc.collect()
+        baseline = tracemalloc.take_snapshot().filter_traces(IGNORED_FRAMES)
+        traced_start, rss_start = tracemalloc.get_traced_memory()[0], rss_bytes()
+
+        self.stdout.write(f"\n{name}")
+        samples = []
+        start = time.perf_counter()
+        for i in range(1, options['requests'] + 1):
+            request()
+            if i % options['interval'] == 0:
+                gc.collect()
+                traced = tracemalloc.get_traced_memory()[0] - traced_start
+                rss = rss_bytes() - rss_start
+                samples.append((i, traced, rss))
+                self.stdout.write(f"  after {i:6}: traced {traced / 1024:+9.1f} KiB, RSS {rss / 1024:+9.1f} KiB")
+        elapsed = time.perf_counter() - start
+
+        final = tracemalloc.take_snapshot().filter_traces(IGNORED_FRAMES)
+        for stat in final.compare_to(baseline, 'lineno')[:options['top']]:
+            if stat.size_diff <= 0:
+                break
+            frame = stat.traceback[0]
+            self.stdout.write(
+                f"  {stat.size_diff / 1024:+8.1f} KiB {stat.count_diff:+7} blocks  {frame.filename}:{frame.lineno}"
+            )
+
+        (first, first_traced, first_rss), (last, last_traced, last_rss) = samples[0], samples[-1]
+        traced = (last_traced - first_traced) / (last - first)
+        rss = (last_rss - first_rss) / (last - first)
+        self.stdout.write(
+            f"  {options['requests'] / elapsed:.0f} requests/s; "
+            f"growth per request: traced {traced:+.1f} B, RSS {rss:+.1f} B"
+        )
+        return traced, rss
@@ -0,0 +1,100 @@
+# portfolio/middleware.py
+
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.urls import Resolver404, resolve, set_urlconf
+
+from .routers import replica_reads
+
+
+class PublicURLconfMiddleware:
+    """
+    Resolves requests outside /admin against settings.PUBLIC_URLCONF, which
+    leaves the admin out, so admin modules are imported on first admin use
+    instead of by the first request of any kind.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not request.path_info.startswith('/admin'):
+            request.urlconf = settings.PUBLIC_URLCONF
+            # The handler only applies request.urlconf after the request
+            # middleware, and some of that resolves the path already.
+            set_urlconf(request.urlconf)
+        return self.get_response(request)
+
+
+def sessionless(view_func):
+    """Marks a public view that never needs request.session or a logged-in user."""
+    view_func.sessionless = True
+    return view_func
+
+
+def is_sessionless(request):
+    if not hasattr(request, '_sessionless'):
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            request._sessionless = False
+        else:
+            request._sessionless = getattr(match.func, 'sessionless', False)
+    return request._sessionless
+
+
+async def _anonymous_auser():
+    return AnonymousUser()
+
+
+class PublicSessionMiddleware(SessionMiddleware):
+    """SessionMiddleware that leaves @sessionless views without a session."""
+
+    def process_request(self, request):
+        if not is_sessionless(request):
+            super().process_request(request)
+
+    def process_response(self, request, response):
+        if not hasattr(request, 'session'):
+            return response
+        return super().process_response(request, response)
+
+
+class PublicAuthenticationMiddleware(AuthenticationMiddleware):
+    """AuthenticationMiddleware that treats visitors of @sessionless views as anonymous."""
+
+    def process_request(self, request):
+        if is_sessionless(request):
+            request.user = AnonymousUser()
+            request.auser = _anonymous_auser
+            return
+        super().process_request(request)
+
+
+class ReplicaReadMiddleware:
+    """
+    Lets public read-only requests (GET/HEAD to @sessionless views) read from
+    the replicas. A successful write through any other view, such as an admin
+    save, sets a short-lived cookie that keeps that browser on the primary
+    until the replicas have caught up, so editors see their own changes.
+    """
+
+    cookie_name = 'primary_reads'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        public = is_sessionless(request)
+        if public and request.method in ('GET', 'HEAD') and self.cookie_name not in request.COOKIES:
+            with replica_reads():
+                return self.get_response(request)
+
+        response = self.get_response(request)
+        if not public and request.method not in ('GET', 'HEAD', 'OPTIONS') and response.status_code < 400:
+            response.set_cookie(
+                self.cookie_name, '1', max_age=settings.REPLICA_LAG_SECONDS, httponly=True, samesite='Lax',
+            )
+        return response
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:41
+
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+from django.db import migrations, models
+
+# Frozen copies of the constants in portfolio/engagement.py at the time of writing.
+EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc)
+HALF_LIFE = timedelta(days=30)
+CLICK_WEIGHTS = {"PROJECT_LIVE_DEMO": 1.0, "PROJECT_GITHUB": 1.0}
+
+
+def backfill_scores(apps, schema_editor):
+    ClickEvent = apps.get_model("portfolio", "ClickEvent")
+    Project = apps.get_model("portfolio", "Project")
+
+    scores = defaultdict(float)
+    clicks = ClickEvent.objects.filter(
+        project__isnull=False, action_type__in=list(CLICK_WEIGHTS)
+    ).values_list("project_id", "action_type", "timestamp")
+    for project_id, action, timestamp in clicks.iterator(chunk_size=2000):
+        scores[project_id] += CLICK_WEIGHTS[action] * 2 ** (
+            (timestamp - EPOCH) / HALF_LIFE
+        )
+
+    Project.objects.bulk_update(
+        [Project(pk=pk, engagement_score=score) for pk, score in scores.items()],
+        ["engagement_score"],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("portfolio", "0005_task"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="project",
+            name="engagement_score",
+            field=models.FloatField(
+                db_index=True,
+                default=0,
+                editable=False,
+                help_text="Forward-decayed click score, maintained by portfolio.engagement.",
+            ),
+        ),
+        migrations.RunPython(backfill_scores, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,95 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("portfolio", "0006_project_engagement_score"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IPAddress",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("address", models.GenericIPAddressField(unique=True)),
+            ],
+            options={
+                "verbose_name": "IP Address",
+                "verbose_name_plural": "IP Addresses",
+            },
+        ),
+        migrations.CreateModel(
+            name="UserAgent",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "ua_hash",
+                    models.CharField(
+                        help_text="SHA-256 of the raw header, for lookups.",
+                        max_length=64,
+                        unique=True,
+                    ),
+                ),
+                ("user_agent", models.TextField()),
+                ("browser", models.CharField(max_length=50)),
+                ("os", models.CharField(max_length=50)),
+                (
+                    "device",
+                    models.CharField(
+                        choices=[
+                            ("DESKTOP", "Desktop"),
+                            ("MOBILE", "Mobile"),
+                            ("TABLET", "Tablet"),
+                            ("BOT", "Bot"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("is_bot", models.BooleanField(default=False)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="clickevent",
+            name="ip",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="click_events",
+                to="portfolio.ipaddress",
+                verbose_name="IP address",
+            ),
+        ),
+        migrations.AddField(
+            model_name="clickevent",
+            name="agent",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="click_events",
+                to="portfolio.useragent",
+                verbose_name="user agent",
+            ),
+        ),
+    ]
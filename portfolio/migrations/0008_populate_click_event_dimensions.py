@@ -0,0 +1,153 @@
+# Moves ClickEvent.user_agent / ip_address into the interned dimension tables.
+
+import hashlib
+import ipaddress
+import re
+
+from django.db import migrations
+
+BATCH_SIZE = 1000
+
+# Frozen copies of the classification rules and helpers in
+# portfolio/dimensions.py at the time of writing, so later edits there don't
+# change what this migration does.
+BOT_PATTERN = re.compile(
+    r"bot|crawl|spider|slurp|preview|monitor|headless|curl|wget|python-requests|httpclient",
+    re.I,
+)
+BROWSER_RULES = [
+    (re.compile(r"Edg(e|A|iOS)?/"), "Edge"),
+    (re.compile(r"OPR/|Opera"), "Opera"),
+    (re.compile(r"SamsungBrowser/"), "Samsung Internet"),
+    (re.compile(r"Firefox/|FxiOS/"), "Firefox"),
+    (re.compile(r"Chrome/|CriOS/"), "Chrome"),
+    (re.compile(r"Safari/"), "Safari"),
+]
+OS_RULES = [
+    (re.compile(r"Windows"), "Windows"),
+    (re.compile(r"iPhone|iPad|iPod"), "iOS"),
+    (re.compile(r"Android"), "Android"),
+    (re.compile(r"CrOS"), "ChromeOS"),
+    (re.compile(r"Mac OS X|Macintosh"), "macOS"),
+    (re.compile(r"Linux"), "Linux"),
+]
+TABLET_PATTERN = re.compile(r"iPad|Tablet|Android(?!.*Mobile)")
+MOBILE_PATTERN = re.compile(r"Mobi|iPhone|iPod")
+
+
+def _first_match(rules, user_agent):
+    for pattern, name in rules:
+        if pattern.search(user_agent):
+            return name
+    return "Other"
+
+
+def classify_user_agent(user_agent):
+    is_bot = bool(BOT_PATTERN.search(user_agent))
+    if is_bot:
+        device = "BOT"
+    elif TABLET_PATTERN.search(user_agent):
+        device = "TABLET"
+    elif MOBILE_PATTERN.search(user_agent):
+        device = "MOBILE"
+    else:
+        device = "DESKTOP"
+    return {
+        "browser": _first_match(BROWSER_RULES, user_agent),
+        "os": _first_match(OS_RULES, user_agent),
+        "device": device,
+        "is_bot": is_bot,
+    }
+
+
+def user_agent_hash(user_agent):
+    return hashlib.sha256(user_agent.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+def normalize_ip(value):
+    try:
+        return str(ipaddress.ip_address((value or "").strip()))
+    except ValueError:
+        return None
+
+
+def populate_dimensions(apps, schema_editor):
+    ClickEvent = apps.get_model("portfolio", "ClickEvent")
+    UserAgent = apps.get_model("portfolio", "UserAgent")
+    IPAddress = apps.get_model("portfolio", "IPAddress")
+
+    agent_ids = {}  # raw user agent -> UserAgent pk
+    ip_ids = {}  # normalized address -> IPAddress pk
+    last_pk = 0
+    while True:
+        batch = list(
+            ClickEvent.objects.filter(pk__gt=last_pk)
+            .order_by("pk")
+            .only("pk", "user_agent", "ip_address")[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        last_pk = batch[-1].pk
+
+        new_agents = {e.user_agent for e in batch if e.user_agent} - agent_ids.keys()
+        if new_agents:
+            UserAgent.objects.bulk_create(
+                [
+                    UserAgent(
+                        ua_hash=user_agent_hash(ua),
+                        user_agent=ua,
+                        **classify_user_agent(ua)
+                    )
+                    for ua in new_agents
+                ],
+                ignore_conflicts=True,
+            )
+            hashes = {user_agent_hash(ua): ua for ua in new_agents}
+            for pk, ua_hash in UserAgent.objects.filter(ua_hash__in=hashes).values_list(
+                "pk", "ua_hash"
+            ):
+                agent_ids[hashes[ua_hash]] = pk
+
+        addresses = {e.pk: normalize_ip(e.ip_address) for e in batch}
+        new_ips = set(filter(None, addresses.values())) - ip_ids.keys()
+        if new_ips:
+            IPAddress.objects.bulk_create(
+                [IPAddress(address=a) for a in new_ips], ignore_conflicts=True
+            )
+            ip_ids.update(
+                IPAddress.objects.filter(address__in=new_ips).values_list(
+                    "address", "pk"
+                )
+            )
+
+        for event in batch:
+            event.agent_id = agent_ids.get(event.user_agent)
+            event.ip_id = ip_ids.get(addresses[event.pk])
+        ClickEvent.objects.bulk_update(batch, ["agent", "ip"])
+
+
+def restore_raw_fields(apps, schema_editor):
+    ClickEvent = apps.get_model("portfolio", "ClickEvent")
+    events = ClickEvent.objects.select_related("agent", "ip").only(
+        "pk", "agent__user_agent", "ip__address"
+    )
+    batch = []
+    for event in events.iterator(chunk_size=BATCH_SIZE):
+        event.user_agent = event.agent.user_agent if event.agent_id else None
+        event.ip_address = event.ip.address if event.ip_id else None
+        batch.append(event)
+        if len(batch) == BATCH_SIZE:
+            ClickEvent.objects.bulk_update(batch, ["user_agent", "ip_address"])
+            batch = []
+    ClickEvent.objects.bulk_update(batch, ["user_agent", "ip_address"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("portfolio", "0007_click_event_dimensions"),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_dimensions, restore_raw_fields),
+    ]
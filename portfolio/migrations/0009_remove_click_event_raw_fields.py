@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:42
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("portfolio", "0008_populate_click_event_dimensions"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="clickevent",
+            name="ip_address",
+        ),
+        migrations.RemoveField(
+            model_name="clickevent",
+            name="user_agent",
+        ),
+    ]
@@ -0,0 +1,160 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:43
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("portfolio", "0009_remove_click_event_raw_fields"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Tenant",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=100)),
+                ("slug", models.SlugField(max_length=100, unique=True)),
+                (
+                    "is_active",
+                    models.BooleanField(
+                        default=True,
+                        help_text="Inactive tenants answer every request with 404.",
+                    ),
+                ),
+                (
+                    "members",
+                    models.ManyToManyField(
+                        blank=True,
+                        help_text="Staff users allowed to edit this portfolio in the admin.",
+                        related_name="tenants",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="Domain",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "host",
+                    models.CharField(
+                        help_text="Hostname without port, e.g. jane.example.com",
+                        max_length=253,
+                        unique=True,
+                    ),
+                ),
+                (
+                    "tenant",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="domains",
+                        to="portfolio.tenant",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name="clickevent",
+            name="tenant",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                to="portfolio.tenant",
+            ),
+        ),
+        migrations.AddField(
+            model_name="contactsubmission",
+            name="tenant",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                to="portfolio.tenant",
+            ),
+        ),
+        migrations.AddField(
+            model_name="expertise",
+            name="tenant",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                to="portfolio.tenant",
+            ),
+        ),
+        migrations.AddField(
+            model_name="generalinfo",
+            name="tenant",
+            field=models.OneToOneField(
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="general_info",
+                to="portfolio.tenant",
+            ),
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="tenant",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                to="portfolio.tenant",
+            ),
+        ),
+        migrations.AddField(
+            model_name="projectcategory",
+            name="tenant",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                to="portfolio.tenant",
+            ),
+        ),
+        migrations.AddField(
+            model_name="skillcategory",
+            name="tenant",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                to="portfolio.tenant",
+            ),
+        ),
+        migrations.AddField(
+            model_name="sociallink",
+            name="tenant",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                to="portfolio.tenant",
+            ),
+        ),
+        migrations.AddField(
+            model_name="tag",
+            name="tenant",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                to="portfolio.tenant",
+            ),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Puts the existing single-site content under a "default" tenant that answers
+# on the hosts the site was deployed with.
+
+from django.db import migrations
+
+DEFAULT_HOSTS = ["muhiuddins-portfolio.onrender.com", "localhost", "127.0.0.1"]
+SCOPED_MODELS = [
+    "GeneralInfo",
+    "SkillCategory",
+    "Expertise",
+    "ProjectCategory",
+    "Tag",
+    "Project",
+    "SocialLink",
+    "ClickEvent",
+    "ContactSubmission",
+]
+
+
+def assign_default_tenant(apps, schema_editor):
+    Tenant = apps.get_model("portfolio", "Tenant")
+    Domain = apps.get_model("portfolio", "Domain")
+
+    tenant, _ = Tenant.objects.get_or_create(slug="default", defaults={"name": "Default"})
+    for host in DEFAULT_HOSTS:
+        Domain.objects.get_or_create(host=host, defaults={"tenant": tenant})
+
+    # GeneralInfo becomes one row per tenant; extra legacy rows were never
+    # shown (the view used .first()), so drop them before assigning.
+    GeneralInfo = apps.get_model("portfolio", "GeneralInfo")
+    first = GeneralInfo.objects.order_by("pk").first()
+    if first is not None:
+        GeneralInfo.objects.exclude(pk=first.pk).delete()
+
+    for model_name in SCOPED_MODELS:
+        apps.get_model("portfolio", model_name).objects.filter(tenant__isnull=True).update(tenant=tenant)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("portfolio", "0010_tenants"),
+    ]
+
+    operations = [
+        migrations.RunPython(assign_default_tenant, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,151 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("portfolio", "0011_assign_default_tenant"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="clickevent",
+            name="tenant",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE, to="portfolio.tenant"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="contactsubmission",
+            name="tenant",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE, to="portfolio.tenant"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="expertise",
+            name="tenant",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE, to="portfolio.tenant"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="generalinfo",
+            name="tenant",
+            field=models.OneToOneField(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="general_info",
+                to="portfolio.tenant",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="project",
+            name="tenant",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE, to="portfolio.tenant"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="projectcategory",
+            name="name",
+            field=models.CharField(max_length=100),
+        ),
+        migrations.AlterField(
+            model_name="projectcategory",
+            name="slug",
+            field=models.SlugField(
+                blank=True,
+                help_text="URL-friendly version of the name. Auto-generated if left blank.",
+                max_length=100,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="projectcategory",
+            name="tenant",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE, to="portfolio.tenant"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="skillcategory",
+            name="name",
+            field=models.CharField(max_length=100),
+        ),
+        migrations.AlterField(
+            model_name="skillcategory",
+            name="slug",
+            field=models.SlugField(
+                blank=True,
+                help_text="URL-friendly version of the name. Auto-generated if left blank.",
+                max_length=100,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="skillcategory",
+            name="tenant",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE, to="portfolio.tenant"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="sociallink",
+            name="tenant",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE, to="portfolio.tenant"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="tag",
+            name="name",
+            field=models.CharField(max_length=50),
+        ),
+        migrations.AlterField(
+            model_name="tag",
+            name="tenant",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE, to="portfolio.tenant"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="project",
+            index=models.Index(
+                fields=["tenant", "-engagement_score"],
+                name="project_tenant_popular_idx",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="projectcategory",
+            constraint=models.UniqueConstraint(
+                fields=("tenant", "name"),
+                name="unique_project_category_name_per_tenant",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="projectcategory",
+            constraint=models.UniqueConstraint(
+                fields=("tenant", "slug"),
+                name="unique_project_category_slug_per_tenant",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="skillcategory",
+            constraint=models.UniqueConstraint(
+                fields=("tenant", "name"), name="unique_skill_category_name_per_tenant"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="skillcategory",
+            constraint=models.UniqueConstraint(
+                fields=("tenant", "slug"), name="unique_skill_category_slug_per_tenant"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="tag",
+            constraint=models.UniqueConstraint(
+                fields=("tenant", "name"), name="unique_tag_name_per_tenant"
+            ),
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("portfolio", "0012_tenant_scoping"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ShortLink",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("code", models.SlugField(max_length=16, unique=True)),
+                (
+                    "action_type",
+                    models.CharField(
+                        choices=[
+                            ("RESUME_DOWNLOAD", "Resume Download"),
+                            ("PROJECT_LIVE_DEMO", "Project Live Demo"),
+                            ("PROJECT_GITHUB", "Project GitHub"),
+                            ("EMAIL_CLICK", "Email Click"),
+                        ],
+                        max_length=50,
+                    ),
+                ),
+                ("target_url", models.URLField(max_length=500)),
+                (
+                    "project",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="short_links",
+                        to="portfolio.project",
+                    ),
+                ),
+                (
+                    "tenant",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="portfolio.tenant",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("project", "action_type"),
+                        name="unique_short_link_per_project_action",
+                    ),
+                    models.UniqueConstraint(
+                        condition=models.Q(("project__isnull", True)),
+                        fields=("tenant", "action_type"),
+                        name="unique_short_link_per_tenant_action",
+                    ),
+                ],
+            },
+        ),
+    ]
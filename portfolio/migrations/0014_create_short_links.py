@@ -0,0 +1,77 @@
+# Gives existing project buttons and resumes their /go/<code>/ short links.
+# Self-contained: the code generator is frozen here, and storage is never
+# touched, so migrating needs neither the app code nor media credentials.
+
+import secrets
+import string
+from urllib.parse import urljoin
+
+from django.conf import settings
+from django.db import migrations
+
+CODE_ALPHABET = string.ascii_letters + string.digits
+CODE_LENGTH = 6
+
+PROJECT_LINKS = (("PROJECT_GITHUB", "github_link"), ("PROJECT_LIVE_DEMO", "live_demo_link"))
+
+
+def resume_target(name):
+    """
+    Builds a resume's URL from its stored file name. Saving the GeneralInfo,
+    or a finished upload, retargets the link to the URL its storage reports.
+    """
+    if name.startswith(("http://", "https://")):
+        return name
+    return urljoin(settings.MEDIA_URL, name)
+
+
+def create_short_links(apps, schema_editor):
+    GeneralInfo = apps.get_model("portfolio", "GeneralInfo")
+    Project = apps.get_model("portfolio", "Project")
+    ShortLink = apps.get_model("portfolio", "ShortLink")
+
+    used = set(ShortLink.objects.values_list("code", flat=True))
+
+    def code():
+        while True:
+            candidate = "".join(secrets.choice(CODE_ALPHABET) for _ in range(CODE_LENGTH))
+            if candidate not in used:
+                used.add(candidate)
+                return candidate
+
+    links = []
+    for project in Project.objects.only("tenant_id", "github_link", "live_demo_link"):
+        for action_type, field in PROJECT_LINKS:
+            url = getattr(project, field)
+            if url:
+                links.append(
+                    ShortLink(
+                        tenant_id=project.tenant_id,
+                        code=code(),
+                        action_type=action_type,
+                        project=project,
+                        target_url=url,
+                    )
+                )
+    resumes = GeneralInfo.objects.exclude(resume="").exclude(resume=None).values_list("tenant_id", "resume")
+    for tenant_id, resume in resumes:
+        links.append(
+            ShortLink(
+                tenant_id=tenant_id,
+                code=code(),
+                action_type="RESUME_DOWNLOAD",
+                target_url=resume_target(resume),
+            )
+        )
+    ShortLink.objects.bulk_create(links, batch_size=500, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("portfolio", "0013_short_links"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_short_links, migrations.RunPython.noop),
+    ]
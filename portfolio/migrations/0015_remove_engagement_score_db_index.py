@@ -0,0 +1,22 @@
+# Generated by Django 5.2.7 on 2026-10-19 17:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("portfolio", "0014_create_short_links"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="project",
+            name="engagement_score",
+            field=models.FloatField(
+                default=0,
+                editable=False,
+                help_text="Forward-decayed click score, maintained by portfolio.engagement.",
+            ),
+        ),
+    ]
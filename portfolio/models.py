@@ -1,15 +1,43 @@
 # portfolio/models.py
 
 import logging  # 1. Import the logging library
+from django.conf import settings
+from django.core.files.images import get_image_dimensions
 from django.db import models
+from django.db.models import Prefetch
+from django.utils import timezone
 from django.utils.text import slugify
 
 # 2. Get an instance of the logger for this file
 logger = logging.getLogger(__name__)
 
 
-# --- General Site Information (Singleton Model) ---
+# --- Tenants (one portfolio per tenant, selected by request host) ---
+class Tenant(models.Model):
+    name = models.CharField(max_length=100)
+    slug = models.SlugField(max_length=100, unique=True)
+    is_active = models.BooleanField(default=True, help_text="Inactive tenants answer every request with 404.")
+    members = models.ManyToManyField(settings.AUTH_USER_MODEL, blank=True, related_name='tenants', help_text="Staff users allowed to edit this portfolio in the admin.")
+
+    def __str__(self):
+        return self.name
+
+
+class Domain(models.Model):
+    host = models.CharField(max_length=253, unique=True, help_text="Hostname without port, e.g. jane.example.com")
+    tenant = models.ForeignKey(Tenant, related_name='domains', on_delete=models.CASCADE)
+
+    def save(self, *args, **kwargs):
+        self.host = self.host.lower().rstrip('.')
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return self.host
+
+
+# --- General Site Information (Singleton Model, one per tenant) ---
 class GeneralInfo(models.Model):
+    tenant = models.OneToOneField(Tenant, related_name='general_info', on_delete=models.CASCADE)
     name = models.CharField(max_length=100, help_text="Your name for the navbar logo and footer.")
     resume = models.FileField(upload_to='resumes/', blank=True, null=True, help_text="Upload your resume PDF file.")
     hero_title = models.TextField(default="Building digital<br><span class='gradient-text'>experiences</span> that matter")
@@ -18,6 +46,8 @@ class GeneralInfo(models.Model):
     about_title = models.CharField(max_length=200, default="Crafting Digital Solutions")
     about_subtitle = models.TextField(default="Passionate about creating innovative web experiences that combine beautiful design with powerful functionality")
     about_image = models.ImageField(upload_to='profile_images/', help_text="Upload your professional headshot.")
+    about_image_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    about_image_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
     about_content_title = models.CharField(max_length=200, default="Hello! I'm a developer who loves building things for the web.")
     about_content_p1 = models.TextField(default="My journey in web development started years ago...")
     about_content_p2 = models.TextField(default="Currently, I'm focused on building innovative products...")
@@ -39,6 +69,8 @@ class GeneralInfo(models.Model):
 
     # 3. ADDED: Overridden save method with error logging for file uploads
     def save(self, *args, **kwargs):
+        from .tasks import enqueue_upload, stage_upload  # tasks.py imports this module
+
         original = None
         if self.pk:
             try:
@@ -46,14 +78,21 @@ class GeneralInfo(models.Model):
             except GeneralInfo.DoesNotExist:
                 pass
 
+        # Record intrinsic sizes while the upload is still local, so the template
+        # can emit width/height without ever reading the file back from storage.
+        if self.about_image and not self.about_image._committed:
+            self.about_image_width, self.about_image_height = get_image_dimensions(self.about_image)
+
+        # New files are handed to the task worker instead of being uploaded here.
+        staged = [stage_upload(self, field_name, original) for field_name in ('resume', 'about_image')]
+
         try:
             super().save(*args, **kwargs)
-            if (original is None or self.resume != original.resume) and self.resume:
-                logger.info(f"SUCCESS: Resume '{self.resume.name}' uploaded to Cloudinary.")
-            if (original is None or self.about_image != original.about_image) and self.about_image:
-                logger.info(f"SUCCESS: Image '{self.about_image.name}' uploaded to Cloudinary.")
+            for upload in filter(None, staged):
+                enqueue_upload(self, upload)
+                logger.info("QUEUED: '%s' for upload to Cloudinary.", upload.filename)
         except Exception as e:
-            logger.error(f"CRITICAL: Failed to upload file for GeneralInfo. Error: {e}")
+            logger.error("CRITICAL: Failed to queue file upload for GeneralInfo. Error: %s", e)
             raise
 
     def __str__(self):
@@ -65,8 +104,9 @@ class GeneralInfo(models.Model):
 
 # --- Skills Section ---
 class SkillCategory(models.Model):
-    name = models.CharField(max_length=100, unique=True)
-    slug = models.SlugField(max_length=100, unique=True, blank=True, help_text="URL-friendly version of the name. Auto-generated if left blank.")
+    tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE)
+    name = models.CharField(max_length=100)
+    slug = models.SlugField(max_length=100, blank=True, help_text="URL-friendly version of the name. Auto-generated if left blank.")
 
     def save(self, *args, **kwargs):
         if not self.slug:
@@ -76,15 +116,30 @@ class SkillCategory(models.Model):
     def __str__(self):
         return self.name
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['tenant', 'name'], name='unique_skill_category_name_per_tenant'),
+            models.UniqueConstraint(fields=['tenant', 'slug'], name='unique_skill_category_slug_per_tenant'),
+        ]
+
+class SkillQuerySet(models.QuerySet):
+    def for_changelist(self):
+        # The admin list only shows name and category, never the SVG markup.
+        return self.defer('svg_icon_code')
+
+
 class Skill(models.Model):
     category = models.ForeignKey(SkillCategory, related_name='skills', on_delete=models.CASCADE)
     name = models.CharField(max_length=100)
     svg_icon_code = models.TextField(blank=True, null=True, help_text="Paste the full SVG code for the icon.")
 
+    objects = SkillQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.name} ({self.category.name})"
 
 class Expertise(models.Model):
+    tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE)
     svg_icon_code = models.TextField(blank=True, null=True, help_text="Paste the full SVG code for the icon.")
     title = models.CharField(max_length=100)
     description = models.TextField()
@@ -95,8 +150,9 @@ class Expertise(models.Model):
 
 # --- Projects Section ---
 class ProjectCategory(models.Model):
-    name = models.CharField(max_length=100, unique=True)
-    slug = models.SlugField(max_length=100, unique=True, blank=True, help_text="URL-friendly version of the name. Auto-generated if left blank.")
+    tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE)
+    name = models.CharField(max_length=100)
+    slug = models.SlugField(max_length=100, blank=True, help_text="URL-friendly version of the name. Auto-generated if left blank.")
 
     def save(self, *args, **kwargs):
         if not self.slug:
@@ -108,26 +164,63 @@ class ProjectCategory(models.Model):
 
     class Meta:
         verbose_name_plural = "Project Categories"
+        constraints = [
+            models.UniqueConstraint(fields=['tenant', 'name'], name='unique_project_category_name_per_tenant'),
+            models.UniqueConstraint(fields=['tenant', 'slug'], name='unique_project_category_slug_per_tenant'),
+        ]
 
 
 class Tag(models.Model):
-    name = models.CharField(max_length=50, unique=True)
+    tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE)
+    name = models.CharField(max_length=50)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['tenant', 'name'], name='unique_tag_name_per_tenant'),
+        ]
 
     def __str__(self):
         return self.name
 
+class ProjectQuerySet(models.QuerySet):
+    def for_grid(self):
+        """Only the columns the projects grid renders, with trimmed M2M lookups."""
+        return self.only(
+            'title', 'description', 'image', 'image_width', 'image_height',
+            'is_featured',
+        ).prefetch_related(
+            Prefetch('categories', queryset=ProjectCategory.objects.only('slug')),
+            Prefetch('tags', queryset=Tag.objects.only('name')),
+        )
+
+    def for_changelist(self):
+        return self.only('title', 'is_featured', 'engagement_score')
+
+    def popular(self):
+        """Most engaged first; see portfolio/engagement.py for how scores are kept."""
+        return self.order_by('-engagement_score', 'pk')
+
+
 class Project(models.Model):
+    tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE)
     title = models.CharField(max_length=200)
     description = models.TextField()
     image = models.ImageField(upload_to='project_images/')
+    image_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
     github_link = models.URLField(blank=True, null=True)
     live_demo_link = models.URLField(blank=True, null=True)
     is_featured = models.BooleanField(default=False, help_text="Check if this project should appear in the 'Featured' tab.")
+    engagement_score = models.FloatField(default=0, editable=False, help_text="Forward-decayed click score, maintained by portfolio.engagement.")
     categories = models.ManyToManyField(ProjectCategory, related_name='projects')
     tags = models.ManyToManyField(Tag, related_name='projects')
 
+    objects = ProjectQuerySet.as_manager()
+
     # 4. ADDED: Overridden save method with error logging for image uploads
     def save(self, *args, **kwargs):
+        from .tasks import enqueue_upload, stage_upload  # tasks.py imports this module
+
         original = None
         if self.pk:
             try:
@@ -135,20 +228,31 @@ class Project(models.Model):
             except Project.DoesNotExist:
                 pass
 
+        if self.image and not self.image._committed:
+            self.image_width, self.image_height = get_image_dimensions(self.image)
+
+        upload = stage_upload(self, 'image', original)
+
         try:
             super().save(*args, **kwargs)
-            if (original is None or self.image != original.image) and self.image:
-                logger.info(f"SUCCESS: Project image for '{self.title}' uploaded to Cloudinary.")
+            if upload:
+                enqueue_upload(self, upload)
+                logger.info("QUEUED: Project image for '%s' for upload to Cloudinary.", self.title)
         except Exception as e:
-            logger.error(f"CRITICAL: Failed to upload project image for '{self.title}'. Error: {e}")
+            logger.error("CRITICAL: Failed to queue project image for '%s'. Error: %s", self.title, e)
             raise
 
     def __str__(self):
         return self.title
 
+    class Meta:
+        # popular_ranks() reads one tenant's top scores straight off this index.
+        indexes = [models.Index(fields=['tenant', '-engagement_score'], name='project_tenant_popular_idx')]
+
 
 # --- Contact Section ---
 class SocialLink(models.Model):
+    tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE)
     platform_name = models.CharField(max_length=50, help_text="e.g., GitHub, LinkedIn")
     svg_icon_code = models.TextField(blank=True, null=True, help_text="Paste the SVG code from Simple Icons.")
     link = models.URLField()
@@ -157,6 +261,48 @@ class SocialLink(models.Model):
         return self.platform_name
 
 
+# --- Analytics ---
+class UserAgent(models.Model):
+    """One row per distinct User-Agent header, classified once at ingest."""
+    DESKTOP = 'DESKTOP'
+    MOBILE = 'MOBILE'
+    TABLET = 'TABLET'
+    BOT = 'BOT'
+    DEVICE_CHOICES = [
+        (DESKTOP, 'Desktop'),
+        (MOBILE, 'Mobile'),
+        (TABLET, 'Tablet'),
+        (BOT, 'Bot'),
+    ]
+
+    ua_hash = models.CharField(max_length=64, unique=True, help_text="SHA-256 of the raw header, for lookups.")
+    user_agent = models.TextField()
+    browser = models.CharField(max_length=50)
+    os = models.CharField(max_length=50)
+    device = models.CharField(max_length=10, choices=DEVICE_CHOICES)
+    is_bot = models.BooleanField(default=False)
+
+    def __str__(self):
+        return f'{self.browser} on {self.os} ({self.get_device_display()})'
+
+
+class IPAddress(models.Model):
+    address = models.GenericIPAddressField(unique=True)
+
+    class Meta:
+        verbose_name = "IP Address"
+        verbose_name_plural = "IP Addresses"
+
+    def __str__(self):
+        return self.address
+
+
+class ClickEventQuerySet(models.QuerySet):
+    def for_changelist(self):
+        # Skip the raw user agent and the related project's long description.
+        return self.defer('agent__user_agent', 'project__description')
+
+
 class ClickEvent(models.Model):
     ACTION_CHOICES = [
         ('RESUME_DOWNLOAD', 'Resume Download'),
@@ -165,13 +311,16 @@ class ClickEvent(models.Model):
         ('EMAIL_CLICK', 'Email Click'),
     ]
 
+    tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE)
     project = models.ForeignKey(Project, on_delete=models.SET_NULL, null=True, blank=True, related_name="click_events")
     action_type = models.CharField(max_length=50, choices=ACTION_CHOICES)
     timestamp = models.DateTimeField(auto_now_add=True)
-    ip_address = models.GenericIPAddressField(null=True, blank=True)
-    user_agent = models.TextField(null=True, blank=True)
+    ip = models.ForeignKey(IPAddress, on_delete=models.SET_NULL, null=True, blank=True, related_name="click_events", verbose_name="IP address")
+    agent = models.ForeignKey(UserAgent, on_delete=models.SET_NULL, null=True, blank=True, related_name="click_events", verbose_name="user agent")
     details = models.CharField(max_length=255, null=True, blank=True, help_text="e.g., Project ID or other info")
 
+    objects = ClickEventQuerySet.as_manager()
+
     class Meta:
         ordering = ['-timestamp']
 
@@ -179,17 +328,88 @@ class ClickEvent(models.Model):
         return f'{self.get_action_type_display()} at {self.timestamp.strftime("%Y-%m-%d %H:%M")}'
 
 
+# --- Outbound short links (/go/<code>/), kept in sync by portfolio/shortlinks.py ---
+class ShortLink(models.Model):
+    tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE)
+    code = models.SlugField(max_length=16, unique=True)
+    action_type = models.CharField(max_length=50, choices=ClickEvent.ACTION_CHOICES)
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, null=True, blank=True, related_name='short_links')
+    target_url = models.URLField(max_length=500)
+
+    class Meta:
+        constraints = [
+            # One link per project button, and one resume link per tenant.
+            models.UniqueConstraint(fields=['project', 'action_type'], name='unique_short_link_per_project_action'),
+            models.UniqueConstraint(
+                fields=['tenant', 'action_type'], condition=models.Q(project__isnull=True),
+                name='unique_short_link_per_tenant_action',
+            ),
+        ]
+
+    def __str__(self):
+        return f"/go/{self.code}/"
+
+
+class ContactSubmissionQuerySet(models.QuerySet):
+    def for_changelist(self):
+        return self.defer('message')
+
+
 class ContactSubmission(models.Model):
+    tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE)
     name = models.CharField(max_length=100)
     email = models.EmailField()
     subject = models.CharField(max_length=200)
     message = models.TextField()
     timestamp = models.DateTimeField(auto_now_add=True)
 
+    objects = ContactSubmissionQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Contact Submission"
         verbose_name_plural = "Contact Submissions"
         ordering = ['-timestamp']
 
     def __str__(self):
-        return f'Message from {self.name} ({self.email})'
\ No newline at end of file
+        return f'Message from {self.name} ({self.email})'
+
+
+# --- Background Tasks ---
+class TaskQuerySet(models.QuerySet):
+    def for_changelist(self):
+        return self.defer('payload', 'data', 'last_error')
+
+
+class Task(models.Model):
+    """A unit of deferred work, executed by `manage.py run_worker`."""
+    PENDING = 'PENDING'
+    RUNNING = 'RUNNING'
+    DONE = 'DONE'
+    FAILED = 'FAILED'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    data = models.BinaryField(null=True, blank=True, help_text="Raw bytes for the task, e.g. a staged upload.")
+    idempotency_key = models.CharField(max_length=255, unique=True, null=True, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = TaskQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['run_at']
+        indexes = [models.Index(fields=['status', 'run_at'])]
+
+    def __str__(self):
+        return f'{self.name} ({self.get_status_display()})'
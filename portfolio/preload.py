@@ -0,0 +1,111 @@
+# portfolio/preload.py
+"""
+Announces a page's critical assets before the browser has parsed its HTML:
+as `Link: rel=preload` headers on the response and, under an ASGI server that
+supports the `http.response.early_hint` extension, as a 103 Early Hints
+response sent before the view even runs.
+"""
+
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.templatetags.static import static
+from django.urls import Resolver404, resolve
+
+from .tenants import tenant_for_host
+
+logger = logging.getLogger(__name__)
+
+# Must match the stylesheet linked in templates/index.html.
+BOOTSTRAP_ICONS_CSS = 'https://cdn.jsdelivr.net/npm/bootstrap-icons@1.11.1/font/bootstrap-icons.css'
+
+
+def preload_critical_assets(view_func):
+    """Marks a view whose responses should announce the critical assets."""
+    view_func.preload_critical_assets = True
+    return view_func
+
+
+def _wants_preload(func):
+    return getattr(func, 'preload_critical_assets', False)
+
+
+def critical_asset_links():
+    """
+    Returns the Link header values. They name static files only: hashed URLs
+    come from the in-memory staticfiles manifest, so this touches neither the
+    database nor a cache. The about image is lazy-loaded below the fold, and
+    preloading it would only compete with the stylesheets.
+    """
+    return [
+        f'<{static("css/style.css")}>; rel=preload; as=style',
+        f'<{BOOTSTRAP_ICONS_CSS}>; rel=preload; as=style',
+        # The icon font is requested by that stylesheet with CORS; its URL
+        # carries a cache-busting query, so warm the connection instead.
+        '<https://cdn.jsdelivr.net>; rel=preconnect; crossorigin',
+        f'<{static("js/script.js")}>; rel=preload; as=script',
+    ]
+
+
+class PreloadLinkMiddleware:
+    """Adds a Link header to successful HTML responses of @preload_critical_assets views."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        match = request.resolver_match
+        if (
+            match is not None and _wants_preload(match.func)
+            and response.status_code == 200
+            and response.get('Content-Type', '').startswith('text/html')
+        ):
+            response.headers['Link'] = ', '.join(critical_asset_links())
+        return response
+
+
+class EarlyHintsMiddleware:
+    """
+    ASGI wrapper that sends a 103 with the critical assets before handing a
+    GET for a @preload_critical_assets view to Django, so the browser fetches
+    them while the page renders. A no-op on servers without the extension.
+    The hint is best-effort: if it can't be built, the page goes out without it.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope['type'] == 'http' and scope['method'] == 'GET'
+            and 'http.response.early_hint' in scope.get('extensions', {})
+        ):
+            links = await sync_to_async(self._links_for)(scope)
+            if links:
+                await send({'type': 'http.response.early_hint', 'links': [link.encode() for link in links]})
+        await self.app(scope, receive, send)
+
+    @staticmethod
+    def _links_for(scope):
+        try:
+            # Preloading views are public; this keeps the admin URLconf unloaded.
+            match = resolve(scope['path'], settings.PUBLIC_URLCONF)
+        except Resolver404:
+            return None
+        if not _wants_preload(match.func):
+            return None
+        try:
+            # Unknown hosts get a 404, so they get no hint. The host map may
+            # have to be reloaded from the database.
+            host = dict(scope['headers']).get(b'host', b'').decode('latin-1')
+            return critical_asset_links() if tenant_for_host(host) else None
+        except Exception:
+            logger.warning("Skipping 103 Early Hints for %s", scope['path'], exc_info=True)
+            return None
+        finally:
+            # This runs outside Django's request cycle, which would otherwise
+            # close the connection once it breaks or outlives CONN_MAX_AGE.
+            close_old_connections()
@@ -0,0 +1,60 @@
+# portfolio/routers.py
+"""
+Read/write splitting across the primary ('default') and optional read
+replicas ('replica1', 'replica2', ...). Writes always go to the primary, and
+so do reads unless the code opts in with `replica_reads()`; the middleware does
+that for public, read-only requests only.
+"""
+
+import random
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_replica_reads = ContextVar('replica_reads', default=False)
+
+
+@contextmanager
+def replica_reads(enabled=True):
+    """Lets reads inside the block go to a replica (or forces the primary with enabled=False)."""
+    token = _replica_reads.set(enabled)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def primary_reads_since(written_at_ns):
+    """
+    Reads from the primary if `written_at_ns` (a time.time_ns() stamp, e.g. a
+    cache version) is recent enough that a replica may not have the write yet.
+    """
+    if time.time_ns() - written_at_ns < settings.REPLICA_LAG_SECONDS * 1_000_000_000:
+        return replica_reads(False)
+    return nullcontext()
+
+
+class PrimaryReplicaRouter:
+    def __init__(self):
+        self.replicas = [alias for alias in settings.DATABASES if alias.startswith('replica')]
+
+    def db_for_read(self, model, **hints):
+        # Related objects follow the row they were reached from.
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        if not self.replicas or not _replica_reads.get() or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return random.choice(self.replicas)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True  # Replicas hold the same rows as the primary
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
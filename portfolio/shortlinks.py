@@ -0,0 +1,94 @@
+# portfolio/shortlinks.py
+"""
+Short outbound links. Every project button and resume download gets a
+compact code when its owner is saved; the page links to /go/<code>/ and the
+redirect is resolved from an in-memory map, so following one needs no query.
+"""
+
+import secrets
+import string
+from collections import namedtuple
+
+from django.db import IntegrityError, transaction
+
+from .cache import VersionedMap
+from .models import GeneralInfo, Project, ShortLink
+
+CODE_ALPHABET = string.ascii_letters + string.digits
+CODE_LENGTH = 6
+
+# What a code resolves to.
+ResolvedLink = namedtuple('ResolvedLink', ['tenant_id', 'action_type', 'project_id', 'target_url'])
+
+
+def new_code():
+    return ''.join(secrets.choice(CODE_ALPHABET) for _ in range(CODE_LENGTH))
+
+
+def _load_link_map():
+    rows = ShortLink.objects.values_list('code', 'tenant_id', 'action_type', 'project_id', 'target_url')
+    return {code: ResolvedLink(*rest) for code, *rest in rows}
+
+
+_link_map = VersionedMap('shortlinks:version', _load_link_map)
+
+
+def resolve_short_link(code):
+    """Returns the ResolvedLink for `code`, or None."""
+    return _link_map.get().get(code)
+
+
+def invalidate_link_map():
+    _link_map.invalidate()
+
+
+def project_link_codes(tenant_id):
+    """Maps (project_id, action_type) -> code for the tenant's project buttons."""
+    return {
+        (link.project_id, link.action_type): code
+        for code, link in _link_map.get().items()
+        if link.tenant_id == tenant_id and link.project_id is not None
+    }
+
+
+def resume_link_code(tenant_id):
+    for code, link in _link_map.get().items():
+        if link.tenant_id == tenant_id and link.action_type == 'RESUME_DOWNLOAD':
+            return code
+    return None
+
+
+# --- Keeping links in sync with their targets ---
+def _sync(tenant_id, action_type, project, target_url):
+    link = ShortLink.objects.filter(tenant_id=tenant_id, action_type=action_type, project=project).first()
+    if not target_url:
+        if link is not None:
+            link.delete()
+        return
+    if link is not None:
+        # The code survives target changes, so pages cached with it stay valid.
+        if link.target_url != target_url:
+            link.target_url = target_url
+            link.save(update_fields=['target_url'])
+        return
+    while True:
+        try:
+            with transaction.atomic():
+                ShortLink.objects.create(
+                    tenant_id=tenant_id, code=new_code(), action_type=action_type,
+                    project=project, target_url=target_url,
+                )
+            return
+        except IntegrityError:
+            if ShortLink.objects.filter(tenant_id=tenant_id, action_type=action_type, project=project).exists():
+                return  # A concurrent save created it
+            # Otherwise the random code collided; draw another.
+
+
+def sync_short_links(instance):
+    """Creates, retargets or removes the short links for a Project or GeneralInfo."""
+    if isinstance(instance, Project):
+        _sync(instance.tenant_id, 'PROJECT_GITHUB', instance, instance.github_link)
+        _sync(instance.tenant_id, 'PROJECT_LIVE_DEMO', instance, instance.live_demo_link)
+    elif isinstance(instance, GeneralInfo):
+        _sync(instance.tenant_id, 'RESUME_DOWNLOAD', None, instance.resume.url if instance.resume else '')
@@ -0,0 +1,66 @@
+# portfolio/signals.py
+
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import portfolio_cache
+from .dimensions import forget_interned
+from .models import (
+    Domain,
+    Expertise,
+    GeneralInfo,
+    IPAddress,
+    Project,
+    ProjectCategory,
+    Skill,
+    ShortLink,
+    SkillCategory,
+    SocialLink,
+    Tag,
+    Tenant,
+    UserAgent,
+)
+from .shortlinks import invalidate_link_map, sync_short_links
+from .tenants import invalidate_host_map
+
+# Models whose content appears on the public portfolio page.
+CONTENT_MODELS = (GeneralInfo, SkillCategory, Skill, Expertise, ProjectCategory, Tag, Project, SocialLink, ShortLink)
+
+
+def content_tenant_id(instance):
+    """The tenant whose cached pages show `instance`."""
+    if isinstance(instance, Skill):
+        return instance.category.tenant_id
+    return instance.tenant_id
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_on_content_change(sender, instance, **kwargs):
+    if sender in CONTENT_MODELS:
+        portfolio_cache.invalidate(namespace=content_tenant_id(instance))
+    if sender is ShortLink:
+        invalidate_link_map()
+    elif sender in (Tenant, Domain):
+        invalidate_host_map()
+
+
+@receiver(post_delete, sender=UserAgent)
+@receiver(post_delete, sender=IPAddress)
+def forget_interned_on_delete(sender, **kwargs):
+    # Clicks recorded later must not point at the deleted row.
+    forget_interned()
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_save, sender=GeneralInfo)
+def update_short_links(sender, instance, **kwargs):
+    sync_short_links(instance)
+
+
+@receiver(m2m_changed, sender=Project.categories.through)
+@receiver(m2m_changed, sender=Project.tags.through)
+def invalidate_on_project_relations_change(sender, instance, action, **kwargs):
+    if action.startswith('post_'):
+        # `instance` is a Project, or a category/tag for reverse changes; all carry tenant_id.
+        portfolio_cache.invalidate(namespace=instance.tenant_id)
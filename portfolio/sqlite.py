@@ -0,0 +1,26 @@
+# portfolio/sqlite.py
+"""
+Write serialization for the SQLite profile (see DATABASES in settings.py).
+
+SQLite runs one write transaction at a time. Across worker processes, IMMEDIATE
+transactions and the busy timeout make writers queue for the lock instead of
+failing with "database is locked". Within a process, serialized_write() makes
+threads take turns on a lock first, so they wait in arrival order rather than
+polling in SQLite's busy handler. On other databases it is just an atomic block.
+"""
+
+import threading
+from contextlib import contextmanager, nullcontext
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+# Reentrant, so a serialized_write() nested in another doesn't deadlock.
+_write_lock = threading.RLock()
+
+
+@contextmanager
+def serialized_write(using=DEFAULT_DB_ALIAS):
+    """Runs the block's writes as one transaction, one thread at a time on SQLite."""
+    lock = _write_lock if connections[using].vendor == 'sqlite' else nullcontext()
+    with lock, transaction.atomic(using=using):
+        yield
@@ -0,0 +1,17 @@
+# portfolio/storage.py
+
+from django.utils.functional import LazyObject
+
+
+class LazyMediaCloudinaryStorage(LazyObject):
+    """
+    Stands in for `cloudinary_storage.storage.MediaCloudinaryStorage` until a
+    media file is actually read or written. Importing the Cloudinary client
+    pulls in its HTTP stack and validates credentials, which a cold worker
+    serving cached pages never needs.
+    """
+
+    def _setup(self):
+        from cloudinary_storage.storage import MediaCloudinaryStorage
+
+        self._wrapped = MediaCloudinaryStorage()
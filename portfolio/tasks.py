@@ -0,0 +1,201 @@
+# portfolio/tasks.py
+
+import hashlib
+import logging
+from collections import namedtuple
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.mail import send_mail
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .cache import portfolio_cache
+from .models import ContactSubmission, GeneralInfo, Task
+from .shortlinks import sync_short_links
+from .signals import content_tenant_id
+
+logger = logging.getLogger(__name__)
+
+# Registered handlers, keyed by task name. Each handler receives the Task row.
+TASKS = {}
+
+# Retry delays grow as BASE * 2 ** (attempt - 1), capped at MAX.
+RETRY_BACKOFF_BASE = timedelta(seconds=10)
+RETRY_BACKOFF_MAX = timedelta(hours=1)
+
+# A RUNNING task not touched for this long is assumed to belong to a dead worker.
+STALE_AFTER = timedelta(minutes=10)
+
+StagedUpload = namedtuple('StagedUpload', ['field_name', 'filename', 'data'])
+
+
+def task(name):
+    """Registers the decorated function as the handler for `name`."""
+    def decorator(func):
+        TASKS[name] = func
+        return func
+    return decorator
+
+
+def enqueue(name, payload=None, idempotency_key=None, data=None, delay=None, max_attempts=5):
+    """
+    Adds a task to the queue and returns it. If `idempotency_key` was already
+    used, the existing task is returned and nothing new is queued.
+    """
+    if name not in TASKS:
+        raise ValueError(f"Unknown task '{name}'.")
+
+    fields = {
+        'name': name,
+        'payload': payload or {},
+        'data': data,
+        'run_at': timezone.now() + (delay or timedelta()),
+        'max_attempts': max_attempts,
+    }
+    if idempotency_key is None:
+        return Task.objects.create(**fields)
+
+    try:
+        with transaction.atomic():
+            return Task.objects.create(idempotency_key=idempotency_key, **fields)
+    except IntegrityError:
+        return Task.objects.get(idempotency_key=idempotency_key)
+
+
+def _claim(task_id, now):
+    """Marks a task as RUNNING; returns False if another worker got there first."""
+    claimable = Q(status=Task.PENDING) | Q(status=Task.RUNNING, updated_at__lt=now - STALE_AFTER)
+    return Task.objects.filter(claimable, pk=task_id).update(
+        status=Task.RUNNING, attempts=F('attempts') + 1, updated_at=now,
+    ) == 1
+
+
+def run_task(task_obj):
+    """Executes one claimed task and records the outcome, scheduling a retry on failure."""
+    try:
+        TASKS[task_obj.name](task_obj)
+    except Exception as e:
+        if task_obj.attempts >= task_obj.max_attempts:
+            task_obj.status = Task.FAILED
+            logger.error(
+                "CRITICAL: Task '%s' (#%s) failed permanently. Error: %s", task_obj.name, task_obj.pk, e,
+                extra={'task': task_obj.name, 'task_id': task_obj.pk, 'attempts': task_obj.attempts},
+            )
+        else:
+            delay = min(RETRY_BACKOFF_BASE * 2 ** (task_obj.attempts - 1), RETRY_BACKOFF_MAX)
+            task_obj.status = Task.PENDING
+            task_obj.run_at = timezone.now() + delay
+            logger.warning(
+                "Task '%s' (#%s) failed, retrying in %s. Error: %s", task_obj.name, task_obj.pk, delay, e,
+                extra={'task': task_obj.name, 'task_id': task_obj.pk, 'attempts': task_obj.attempts},
+            )
+        task_obj.last_error = str(e)
+    else:
+        task_obj.status = Task.DONE
+        task_obj.data = None  # Staged bytes are no longer needed
+        task_obj.last_error = ''
+    task_obj.save(update_fields=['status', 'run_at', 'data', 'last_error', 'updated_at'])
+
+
+def run_pending(limit=10):
+    """Runs up to `limit` due tasks and returns how many were executed."""
+    now = timezone.now()
+    due = (
+        Task.objects.filter(Q(status=Task.PENDING) | Q(status=Task.RUNNING, updated_at__lt=now - STALE_AFTER))
+        .filter(run_at__lte=now)
+        .values_list('pk', flat=True)[:limit]
+    )
+    executed = 0
+    for task_id in list(due):
+        if not _claim(task_id, now):
+            continue
+        run_task(Task.objects.get(pk=task_id))
+        executed += 1
+    return executed
+
+
+# --- File uploads ---
+def stage_upload(instance, field_name, original):
+    """
+    If `field_name` holds a fresh upload, reads its bytes and returns a
+    StagedUpload; otherwise None. Until the worker stores the file, the field
+    keeps the previous file, or for a first upload the name it will be stored
+    under, so required file fields stay valid when the object is edited again.
+    """
+    fieldfile = getattr(instance, field_name)
+    if not fieldfile or fieldfile._committed:
+        return None
+    data = b''.join(fieldfile.file.chunks())
+    previous = getattr(original, field_name).name if original else None
+    setattr(instance, field_name, previous or fieldfile.field.generate_filename(instance, fieldfile.name))
+    return StagedUpload(field_name, fieldfile.name, data)
+
+
+def enqueue_upload(instance, upload):
+    """
+    Queues the upload of a StagedUpload to `instance`'s storage. Saving the
+    same upload again before the field changes (a retried or double-submitted
+    save) returns the task already queued for it.
+    """
+    staged_name = getattr(instance, upload.field_name).name
+    digest = hashlib.sha256()
+    for part in (staged_name.encode(), upload.filename.encode(), upload.data):
+        digest.update(part)
+        digest.update(b'\0')
+    return enqueue(
+        'upload_field_file',
+        payload={
+            'model': instance._meta.label,
+            'pk': instance.pk,
+            'field': upload.field_name,
+            'filename': upload.filename,
+        },
+        idempotency_key=f'upload:{instance._meta.label}:{instance.pk}:{upload.field_name}:{digest.hexdigest()}',
+        data=upload.data,
+    )
+
+
+@task('upload_field_file')
+def upload_field_file(task_obj):
+    model = apps.get_model(task_obj.payload['model'])
+    pk, field_name = task_obj.payload['pk'], task_obj.payload['field']
+
+    # A later upload to the same field wins; skip this one rather than overwrite
+    # it. One that failed for good stores nothing, so it doesn't count.
+    superseded = Task.objects.filter(
+        name=task_obj.name, pk__gt=task_obj.pk, status__in=[Task.PENDING, Task.RUNNING, Task.DONE],
+        payload__model=task_obj.payload['model'], payload__pk=pk, payload__field=field_name,
+    ).exists()
+    if superseded:
+        logger.info("Skipping superseded upload '%s'.", task_obj.payload['filename'])
+        return
+
+    instance = model.objects.get(pk=pk)
+    field = model._meta.get_field(field_name)
+    name = field.generate_filename(instance, task_obj.payload['filename'])
+    stored_name = field.storage.save(name, ContentFile(bytes(task_obj.data)), max_length=field.max_length)
+    model.objects.filter(pk=pk).update(**{field_name: stored_name})
+    # update() sends no post_save, so do what its receivers would.
+    setattr(instance, field_name, stored_name)
+    sync_short_links(instance)
+    portfolio_cache.invalidate(namespace=content_tenant_id(instance))
+    logger.info("SUCCESS: '%s' uploaded to Cloudinary.", stored_name)
+
+
+# --- Notifications ---
+@task('notify_contact_submission')
+def notify_contact_submission(task_obj):
+    submission = ContactSubmission.objects.get(pk=task_obj.payload['submission_id'])
+    info = GeneralInfo.objects.only('contact_email').filter(tenant_id=submission.tenant_id).first()
+    if info is None:
+        return
+    send_mail(
+        subject=f"[Portfolio] {submission.subject}",
+        message=f"From: {submission.name} <{submission.email}>\n\n{submission.message}",
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        recipient_list=[info.contact_email],
+    )
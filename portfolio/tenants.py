@@ -0,0 +1,46 @@
+# portfolio/tenants.py
+"""
+Host-based tenant resolution. Every worker keeps the whole host -> tenant map
+in memory and reloads it only when a Tenant or Domain changes.
+"""
+
+from django.http import Http404
+from django.http.request import split_domain_port
+
+from .cache import VersionedMap
+from .models import Domain
+
+
+def _load_host_map():
+    domains = Domain.objects.filter(tenant__is_active=True).select_related('tenant')
+    return {domain.host: domain.tenant for domain in domains}
+
+
+_host_map = VersionedMap('tenants:version', _load_host_map)
+
+
+def host_map():
+    """Returns {host: Tenant} for every active tenant."""
+    return _host_map.get()
+
+
+def invalidate_host_map():
+    _host_map.invalidate()
+
+
+def tenant_for_host(host):
+    domain, _ = split_domain_port(host)
+    return host_map().get(domain.rstrip('.'))
+
+
+class TenantMiddleware:
+    """Sets request.tenant from the Host header; unknown hosts get a 404."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.tenant = tenant_for_host(request.get_host())
+        if request.tenant is None:
+            raise Http404("No portfolio is configured for this host.")
+        return self.get_response(request)
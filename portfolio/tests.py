@@ -1,3 +1,959 @@
-from django.test import TestCase
+import io
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import nullcontext
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django import forms
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.cache import cache
+from django.core.files.storage import storages
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, connections, transaction
+from django.test import Client, RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from PIL import Image
+
+from .admission import (
+    NORMAL, SHED_COUNTER_KEY, TRACKING, LatencyMonitor, ShedCounter, controller, shed_counts,
+)
+from .cache import Entry, TieredCache, VersionedMap, portfolio_cache
+from .dimensions import forget_interned, intern_ip, intern_user_agent
+from .engagement import EPOCH, HALF_LIFE, current_score, popular_ranks, record_click
+from .log import JsonFormatter, QueueStreamHandler, SampleFilter
+from .management.commands.check_admin_queries import (
+    changelist_request, changelist_rows, find_changelist_n_plus_one,
+)
+from .preload import EarlyHintsMiddleware
+from .routers import replica_reads
+from .sqlite import serialized_write
+from .tasks import enqueue_upload, run_pending, stage_upload
+from .tenants import invalidate_host_map
+from .views import CONTACT_SUCCESS_MESSAGE
+from .models import (
+    ClickEvent, ContactSubmission, Domain, Expertise, GeneralInfo, IPAddress, Project, ProjectCategory, Skill,
+    ShortLink, SkillCategory, SocialLink, Tag, Task, Tenant, UserAgent,
+)
+
+# Media goes to memory instead of Cloudinary, and static files need no manifest.
+TEST_STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.InMemoryStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+
+def seed_portfolio(tenant, projects=3, skills=3):
+    """Gives `tenant` a GeneralInfo, a skill category with skills and some projects."""
+    GeneralInfo.objects.create(tenant=tenant, name=f"Owner {tenant.slug}")
+    category = SkillCategory.objects.create(tenant=tenant, name="Backend")
+    Skill.objects.bulk_create(Skill(category=category, name=f"Skill {i}") for i in range(skills))
+    project_category = ProjectCategory.objects.create(tenant=tenant, name="Web")
+    for i in range(projects):
+        project = Project.objects.create(
+            tenant=tenant, title=f"Project {i}", description="-", image='project.png',
+            github_link=f"https://github.com/example/{tenant.slug}-{i}",
+        )
+        project.categories.add(project_category)
+
+
+# No read routing: a replica connection can't see the rows of a TestCase's
+# open transaction. RouterTests cover routing.
+@override_settings(STORAGES=TEST_STORAGES, ALLOWED_HOSTS=['*'], DATABASE_ROUTERS=[])
+class PortfolioTestCase(TestCase):
+    """Runs against the 'default' tenant (created by migration 0011) with empty caches."""
+
+    def setUp(self):
+        cache.clear()
+        portfolio_cache.local.clear()
+        self.tenant = Tenant.objects.get(slug='default')
+        self.client.defaults['HTTP_HOST'] = 'localhost'
+
+
+class DeferredSectionTests(PortfolioTestCase):
+    def setUp(self):
+        super().setUp()
+        seed_portfolio(self.tenant)
+
+    def test_page_defers_sections_with_a_noscript_fallback(self):
+        html = self.client.get('/').content.decode()
+        self.assertIn('data-deferred-url="/section/skills/"', html)
+        self.assertIn('<noscript><a class="btn btn-secondary" href="?sections=inline#skills">', html)
+        self.assertNotIn("Project 0", html)
+
+    def test_inline_variant_renders_sections_server_side(self):
+        html = self.client.get('/', {'sections': 'inline'}).content.decode()
+        self.assertNotIn('data-deferred-url', html)
+        self.assertIn("Skill 0", html)
+        self.assertIn("Project 0", html)
+
+    def test_section_endpoint(self):
+        self.assertContains(self.client.get('/section/projects/'), "Project 2")
+        self.assertEqual(self.client.get('/section/unknown/').status_code, 404)
+
+
+class PreloadTests(PortfolioTestCase):
+    def setUp(self):
+        super().setUp()
+        seed_portfolio(self.tenant)
+        GeneralInfo.objects.filter(tenant=self.tenant).update(about_image='about.png')
+
+    def test_page_announces_static_assets_but_not_the_lazy_about_image(self):
+        link = self.client.get('/')['Link']
+        self.assertIn('</static/css/style.css>; rel=preload; as=style', link)
+        self.assertIn('</static/js/script.js>; rel=preload; as=script', link)
+        self.assertNotIn('about.png', link)
+
+    def test_other_views_get_no_link_header(self):
+        self.assertNotIn('Link', self.client.get('/section/skills/'))
+
+    def early_hint(self, path, host='localhost'):
+        """Runs EarlyHintsMiddleware for a GET; returns (messages sent, app ran, connection cleanups)."""
+        sent, app_calls = [], []
+
+        async def app(scope, receive, send):
+            app_calls.append(scope)
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {
+            'type': 'http', 'method': 'GET', 'path': path, 'headers': [(b'host', host.encode())],
+            'extensions': {'http.response.early_hint': {}},
+        }
+        # The hint is built on this thread; closing its connection would end the test's transaction.
+        with mock.patch('portfolio.preload.close_old_connections') as close:
+            async_to_sync(EarlyHintsMiddleware(app))(scope, None, send)
+        return sent, bool(app_calls), close.call_count
+
+    def test_sends_a_103_before_the_page(self):
+        sent, app_ran, close_calls = self.early_hint('/')
+        self.assertEqual(sent[0]['type'], 'http.response.early_hint')
+        self.assertIn(b'</static/css/style.css>; rel=preload; as=style', sent[0]['links'])
+        self.assertTrue(app_ran)
+        self.assertEqual(close_calls, 1)
+
+    def test_no_hint_for_unknown_hosts_or_other_views(self):
+        self.assertEqual(self.early_hint('/', host='unknown.invalid')[0], [])
+        self.assertEqual(self.early_hint('/section/skills/')[0], [])
+
+    def test_a_failing_lookup_skips_the_hint_but_not_the_page(self):
+        with mock.patch('portfolio.preload.tenant_for_host', side_effect=RuntimeError("cache down")), \
+                self.assertLogs('portfolio.preload', 'WARNING'):
+            sent, app_ran, close_calls = self.early_hint('/')
+        self.assertEqual(sent, [])
+        self.assertTrue(app_ran)
+        self.assertEqual(close_calls, 1)
+
+
+# Room for every tenant's entries, so culling doesn't look like an invalidation.
+@override_settings(CACHES={'default': {
+    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'OPTIONS': {'MAX_ENTRIES': 10_000},
+}})
+class TenantIsolationTests(PortfolioTestCase):
+    """Many tenants served side by side: host routing, isolation and per-tenant cache invalidation."""
+    TENANTS = 300
+
+    def setUp(self):
+        super().setUp()
+        self.tenants = Tenant.objects.bulk_create(
+            Tenant(name=f"Check {i}", slug=f"check-{i}") for i in range(self.TENANTS)
+        )
+        Domain.objects.bulk_create(Domain(host=f"{tenant.slug}.invalid", tenant=tenant) for tenant in self.tenants)
+        GeneralInfo.objects.bulk_create(GeneralInfo(tenant=tenant, name=f"Owner {tenant.slug}") for tenant in self.tenants)
+        Project.objects.bulk_create(
+            Project(tenant=tenant, title=f"Project {tenant.slug}", description="-", image='check.png')
+            for tenant in self.tenants
+        )
+        invalidate_host_map()
+        self.addCleanup(invalidate_host_map)
+
+    def client_for(self, tenant):
+        return Client(HTTP_HOST=f"{tenant.slug}.invalid")
+
+    def test_each_tenant_sees_only_its_own_content(self):
+        for tenant in self.tenants:
+            client = self.client_for(tenant)
+            html = client.get('/').content.decode() + client.get('/section/projects/').content.decode()
+            self.assertIn(f"Owner {tenant.slug}", html)
+            self.assertIn(f"Project {tenant.slug}<", html)
+            leaked = [other.slug for other in self.tenants if other != tenant and f"Project {other.slug}<" in html]
+            self.assertEqual(leaked, [], f"{tenant.slug} shows other tenants' projects")
+
+    def test_unknown_host_is_rejected(self):
+        self.assertEqual(Client(HTTP_HOST='unknown.invalid').get('/').status_code, 404)
+
+    def test_edit_invalidates_only_its_tenant(self):
+        edited, untouched = self.tenants[0], self.tenants[1:]
+        client = self.client_for(edited)
+        client.get('/')
+        before = {tenant.pk: portfolio_cache.version(tenant.pk) for tenant in untouched}
+        info = GeneralInfo.objects.get(tenant=edited)
+        info.name = "Renamed owner"
+        info.save()
+        self.assertContains(client.get('/'), "Renamed owner")
+        self.assertEqual(
+            [tenant.slug for tenant in untouched if portfolio_cache.version(tenant.pk) != before[tenant.pk]], [],
+        )
+
+
+class TrackClickTests(PortfolioTestCase):
+    def test_records_the_click_without_redirecting(self):
+        response = self.client.get('/track_click/', {'action': 'EMAIL_CLICK', 'redirect_url': 'https://evil.example/'})
+        self.assertEqual(response.status_code, 204)
+        self.assertNotIn('Location', response)
+        self.assertTrue(ClickEvent.objects.filter(tenant=self.tenant, action_type='EMAIL_CLICK').exists())
+
+
+class ContactSubmitTests(PortfolioTestCase):
+    """The JSON contract script.js relies on."""
+
+    fields = {'name': "Ada", 'email': 'ada@example.com', 'subject': "Hello", 'message': "Hi there"}
+
+    def test_valid_submission_returns_201_with_the_message(self):
+        response = self.client.post('/contact/', self.fields)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json(), {'message': CONTACT_SUCCESS_MESSAGE})
+        self.assertTrue(ContactSubmission.objects.filter(tenant=self.tenant, email='ada@example.com').exists())
+
+    def test_invalid_submission_returns_400_with_errors_by_field(self):
+        response = self.client.post('/contact/', {**self.fields, 'email': 'not-an-email', 'message': ''})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.json()['errors']), {'email', 'message'})
+        self.assertFalse(ContactSubmission.objects.exists())
+
+    def test_csrf_token_is_required(self):
+        client = Client(enforce_csrf_checks=True, HTTP_HOST='localhost')
+        self.assertEqual(client.post('/contact/', self.fields).status_code, 403)
+        client.get('/')  # Sets the CSRF cookie, as the page does for script.js
+        token = client.cookies['csrftoken'].value
+        self.assertEqual(client.post('/contact/', {**self.fields, 'csrfmiddlewaretoken': token}).status_code, 201)
+
+
+class EngagementScoreTests(PortfolioTestCase):
+    def setUp(self):
+        super().setUp()
+        self.old, self.recent, self.middle, self.unclicked = (
+            Project.objects.create(tenant=self.tenant, title=title, description="-", image='project.png')
+            for title in ("Old", "Recent", "Middle", "Unclicked")
+        )
+
+    def test_ranking_follows_forward_decay(self):
+        start = EPOCH + 10 * HALF_LIFE
+        for _ in range(3):
+            record_click(self.old.pk, 'PROJECT_GITHUB', when=start)
+        # One half-life later a click counts as much as 2 at `start`, two half-lives later as 4.
+        record_click(self.middle.pk, 'PROJECT_LIVE_DEMO', when=start + HALF_LIFE)
+        record_click(self.recent.pk, 'PROJECT_GITHUB', when=start + 2 * HALF_LIFE)
+        record_click(self.unclicked.pk, 'EMAIL_CLICK', when=start + 2 * HALF_LIFE)  # Not scored
+
+        self.assertEqual(
+            popular_ranks(self.tenant), {self.recent.pk: 1, self.old.pk: 2, self.middle.pk: 3},
+        )
+        now = start + 2 * HALF_LIFE
+        scores = {project.title: current_score(project, now) for project in Project.objects.filter(tenant=self.tenant)}
+        self.assertAlmostEqual(scores["Recent"], 1.0)
+        self.assertAlmostEqual(scores["Old"], 0.75)
+        self.assertAlmostEqual(scores["Middle"], 0.5)
+        self.assertEqual(scores["Unclicked"], 0)
+
+
+def fetched_bytes(evaluate):
+    """Runs `evaluate()`; returns the SQL it issued and the bytes of every value those queries return."""
+    with CaptureQueriesContext(connection) as queries:
+        evaluate()
+    size = 0
+    with connection.cursor() as cursor:
+        for query in queries:
+            cursor.execute(query['sql'])
+            for row in cursor.fetchall():
+                size += sum(len(value) if isinstance(value, (str, bytes, memoryview)) else 8 for value in row if value is not None)
+    return [query['sql'] for query in queries], size
+
+
+class ColumnPruningTests(PortfolioTestCase):
+    """Each list path fetches the columns it shows, not the large text next to them."""
+    ROWS = 10
+    BLOB = 'x' * 20_000
+    DESCRIPTION = 'd' * 500  # Shown on the grid, so it is fetched there
+
+    def setUp(self):
+        super().setUp()
+        category = ProjectCategory.objects.create(tenant=self.tenant, name="Web")
+        tag = Tag.objects.create(tenant=self.tenant, name="django")
+        for i in range(self.ROWS):
+            project = Project.objects.create(
+                tenant=self.tenant, title=f"Project {i}", description=self.DESCRIPTION, image='project.png',
+            )
+            project.categories.add(category)
+            project.tags.add(tag)
+        skill_category = SkillCategory.objects.create(tenant=self.tenant, name="Backend")
+        Skill.objects.bulk_create(
+            Skill(category=skill_category, name=f"Skill {i}", svg_icon_code=self.BLOB) for i in range(self.ROWS)
+        )
+        big_project = Project.objects.create(tenant=self.tenant, title="Big", description=self.BLOB, image='big.png')
+        ip = IPAddress.objects.create(address='203.0.113.7')
+        agents = UserAgent.objects.bulk_create(
+            UserAgent(ua_hash=str(i), user_agent=self.BLOB, browser='Chrome', os='Linux', device=UserAgent.DESKTOP)
+            for i in range(self.ROWS)
+        )
+        ClickEvent.objects.bulk_create(
+            ClickEvent(tenant=self.tenant, action_type='PROJECT_GITHUB', project=big_project, ip=ip, agent=agent)
+            for agent in agents
+        )
+        ContactSubmission.objects.bulk_create(
+            ContactSubmission(tenant=self.tenant, name="A", email='a@example.com', subject="Hi", message=self.BLOB)
+            for _ in range(self.ROWS)
+        )
+        Task.objects.bulk_create(
+            Task(name='upload_field_file', payload={'blob': self.BLOB}, data=self.BLOB.encode(), last_error=self.BLOB)
+            for _ in range(self.ROWS)
+        )
+
+    def assertPruned(self, evaluate, max_bytes_per_row, skipped_columns):
+        sql, size = fetched_bytes(evaluate)
+        for column in skipped_columns:
+            self.assertFalse(any(column in query for query in sql), f"{column} was selected")
+        self.assertLessEqual(size, self.ROWS * max_bytes_per_row)
+
+    def test_projects_grid(self):
+        self.assertPruned(
+            lambda: list(Project.objects.filter(tenant=self.tenant).exclude(title="Big").for_grid()),
+            len(self.DESCRIPTION) + 200,
+            ['"engagement_score"', '"github_link"', '"portfolio_projectcategory"."name"'],
+        )
+
+    def test_project_changelist(self):
+        self.assertPruned(lambda: list(Project.objects.for_changelist()), 200, ['"description"'])
+
+    def test_skill_changelist(self):
+        self.assertPruned(
+            lambda: list(Skill.objects.select_related('category').for_changelist()), 200, ['"svg_icon_code"'],
+        )
+
+    def test_click_event_changelist(self):
+        self.assertPruned(
+            lambda: list(ClickEvent.objects.select_related('project', 'ip', 'agent').for_changelist()),
+            400, ['"user_agent"', '"description"'],
+        )
+
+    def test_contact_submission_changelist(self):
+        self.assertPruned(lambda: list(ContactSubmission.objects.for_changelist()), 200, ['"message"'])
+
+    def test_task_changelist(self):
+        self.assertPruned(
+            lambda: list(Task.objects.for_changelist()), 300, ['"payload"', '"data"', '"last_error"'],
+        )
+
+    def test_unpruned_querysets_fetch_the_blobs(self):
+        # Guards the measurement itself: the same rows, unpruned, are far bigger.
+        _, size = fetched_bytes(lambda: list(ContactSubmission.objects.all()))
+        self.assertGreater(size, self.ROWS * len(self.BLOB))
+
+
+class AdminChangelistQueryTests(PortfolioTestCase):
+    """Every registered changelist renders in a constant number of queries, whatever the page size."""
+    ROWS = 6
+
+    def setUp(self):
+        super().setUp()
+        n = self.ROWS
+        tenant = self.tenant
+        for i in range(n):
+            other = Tenant.objects.create(name=f"Tenant {i}", slug=f"tenant-{i}")
+            Domain.objects.create(host=f"tenant-{i}.invalid", tenant=other)
+        GeneralInfo.objects.create(tenant=tenant, name="Owner")
+        users = [get_user_model().objects.create_user(f'user{i}') for i in range(n)]
+        tenant.members.add(*users)
+        Group.objects.bulk_create(Group(name=f"Group {i}") for i in range(n))
+
+        tags = Tag.objects.bulk_create(Tag(tenant=tenant, name=f"tag-{i}") for i in range(n))
+        project_categories = [ProjectCategory.objects.create(tenant=tenant, name=f"Category {i}") for i in range(n)]
+        projects = []
+        for i in range(n):
+            # Created one by one so their short links are made too.
+            project = Project.objects.create(
+                tenant=tenant, title=f"Project {i}", description="-", image='project.png',
+                github_link=f"https://github.com/example/{i}", live_demo_link=f"https://example.com/{i}/",
+            )
+            project.categories.add(*project_categories)
+            project.tags.add(*tags)
+            projects.append(project)
+        for i in range(n):
+            category = SkillCategory.objects.create(tenant=tenant, name=f"Skills {i}")
+            Skill.objects.bulk_create(Skill(category=category, name=f"Skill {i}.{j}") for j in range(2))
+        Expertise.objects.bulk_create(Expertise(tenant=tenant, title=f"Expertise {i}", description="-") for i in range(n))
+        SocialLink.objects.bulk_create(
+            SocialLink(tenant=tenant, platform_name=f"Site {i}", link=f"https://example.com/{i}") for i in range(n)
+        )
+
+        # Distinct project, IP and agent per click, so a per-row lookup on any of them shows up.
+        ips = IPAddress.objects.bulk_create(IPAddress(address=f'203.0.113.{i}') for i in range(n))
+        agents = UserAgent.objects.bulk_create(
+            UserAgent(ua_hash=str(i), user_agent=f"Agent {i}", browser='Chrome', os='Linux', device=UserAgent.DESKTOP)
+            for i in range(n)
+        )
+        ClickEvent.objects.bulk_create(
+            ClickEvent(tenant=tenant, action_type='PROJECT_GITHUB', project=project, ip=ip, agent=agent)
+            for project, ip, agent in zip(projects, ips, agents)
+        )
+        ContactSubmission.objects.bulk_create(
+            ContactSubmission(tenant=tenant, name=f"Sender {i}", email='a@example.com', subject="Hi", message="-")
+            for i in range(n)
+        )
+        Task.objects.bulk_create(Task(name='notify_contact_submission', idempotency_key=str(i)) for i in range(n))
+
+    def test_every_changelist_is_seeded(self):
+        for model_admin in admin.site._registry.values():
+            if model_admin.model is GeneralInfo:
+                continue  # One per tenant by design
+            with self.subTest(model=model_admin.model._meta.label):
+                self.assertGreaterEqual(changelist_rows(model_admin, self.tenant), self.ROWS)
+
+    def test_changelist_queries_do_not_grow_with_page_size(self):
+        offenders = find_changelist_n_plus_one(self.tenant, small=1, large=self.ROWS)
+        self.assertEqual(
+            [(model_admin.model._meta.label, small, large) for model_admin, small, large in offenders], [],
+        )
+
+
+class AdminBulkActionTests(PortfolioTestCase):
+    """Bulk actions run a fixed number of queries and invalidate the tenant's cache once."""
+
+    def setUp(self):
+        super().setUp()
+        tenant = self.tenant
+        self.projects = Project.objects.bulk_create(
+            Project(tenant=tenant, title=f"Project {i}", description="-", image='project.png') for i in range(50)
+        )
+        self.project_category = ProjectCategory.objects.create(tenant=tenant, name="Web")
+        self.tag = Tag.objects.create(tenant=tenant, name="django")
+        skill_category = SkillCategory.objects.create(tenant=tenant, name="Backend")
+        self.skill_category = SkillCategory.objects.create(tenant=tenant, name="Frontend")
+        self.skills = Skill.objects.bulk_create(Skill(category=skill_category, name=f"Skill {i}") for i in range(50))
+
+    def run_action(self, model, action, rows, num_queries=None, **choices):
+        """Posts `action` for `rows` to `model`'s changelist; returns its query count."""
+        model_admin = admin.site._registry[model]
+        opts = model._meta
+        request = RequestFactory().post(f'/admin/{opts.app_label}/{opts.model_name}/', {
+            'action': action, '_selected_action': [row.pk for row in rows], 'index': 0, **choices,
+        })
+        request.user = get_user_model()(is_active=True, is_staff=True, is_superuser=True)
+        request.tenant = self.tenant
+        request._messages = CookieStorage(request)
+        request._dont_enforce_csrf_checks = True
+        with mock.patch.object(portfolio_cache, 'invalidate') as invalidate, \
+                CaptureQueriesContext(connection) as queries:
+            response = model_admin.changelist_view(request)
+        self.assertEqual(response.status_code, 302)  # Back to the changelist: the action ran
+        invalidate.assert_called_once_with(namespace=self.tenant.pk)
+        if num_queries is not None:
+            self.assertEqual(len(queries), num_queries, [query['sql'] for query in queries])
+        return len(queries)
+
+    def assert_constant_queries(self, model, action, rows, **choices):
+        small = self.run_action(model, action, rows[:5], **choices)
+        self.run_action(model, action, rows, num_queries=small, **choices)
+
+    def test_project_actions(self):
+        category, tag = {'category': self.project_category.pk}, {'tag': self.tag.pk}
+        for action, choices in [
+            ('feature', {}), ('unfeature', {}),
+            ('add_to_category', category), ('remove_from_category', category),
+            ('add_tag', tag), ('remove_tag', tag),
+        ]:
+            with self.subTest(action=action):
+                self.assert_constant_queries(Project, action, self.projects, **choices)
+
+    def test_actions_change_every_selected_row(self):
+        self.run_action(Project, 'feature', self.projects)
+        self.run_action(Project, 'add_to_category', self.projects, category=self.project_category.pk)
+        self.assertEqual(Project.objects.filter(is_featured=True).count(), 50)
+        self.assertEqual(self.project_category.projects.count(), 50)
+
+    def test_move_skills_to_category(self):
+        self.assert_constant_queries(Skill, 'move_to_category', self.skills, category=self.skill_category.pk)
+        self.assertEqual(self.skill_category.skills.count(), 50)
+
+
+class InternedDimensionTests(PortfolioTestCase):
+    USER_AGENT = 'Mozilla/5.0 (X11; Linux x86_64) Firefox/130.0'
+
+    def setUp(self):
+        super().setUp()
+        forget_interned()
+
+    def test_rolled_back_rows_are_not_memoized(self):
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            rolled_back = intern_ip('203.0.113.9')
+            raise RuntimeError
+        self.assertFalse(IPAddress.objects.filter(pk=rolled_back).exists())
+        with self.captureOnCommitCallbacks(execute=True):
+            pk = intern_ip('203.0.113.9')
+        self.assertTrue(IPAddress.objects.filter(pk=pk).exists())
+        with self.assertNumQueries(0):
+            self.assertEqual(intern_ip('203.0.113.9'), pk)
+
+    def test_deleted_rows_are_forgotten(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            pk = intern_user_agent(self.USER_AGENT)
+        UserAgent.objects.filter(pk=pk).delete()
+        self.assertTrue(UserAgent.objects.filter(pk=intern_user_agent(self.USER_AGENT)).exists())
+
+    def test_admin_cannot_delete_dimension_rows(self):
+        request = changelist_request(admin.site._registry[UserAgent], self.tenant)
+        for model in (UserAgent, IPAddress):
+            self.assertFalse(admin.site._registry[model].has_delete_permission(request))
+
+
+def png_upload(name, size=(4, 3)):
+    buffer = io.BytesIO()
+    Image.new('RGB', size).save(buffer, 'PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+
+class StagedUploadTests(PortfolioTestCase):
+    def test_new_project_keeps_its_pending_image_name(self):
+        project = Project.objects.create(
+            tenant=self.tenant, title="Fresh", description="-", image=png_upload('shot.png'),
+        )
+        project.refresh_from_db()
+        self.assertEqual(project.image.name, 'project_images/shot.png')
+        self.assertEqual((project.image_width, project.image_height), (4, 3))
+        # Looked up here, under TEST_STORAGES: the configured default is Cloudinary.
+        media = storages['default']
+        self.assertFalse(media.exists('project_images/shot.png'))
+
+        # Re-opening the change form before the worker ran must not lose the required image.
+        ProjectForm = forms.modelform_factory(Project, fields=['title', 'description', 'image'])
+        form = ProjectForm({'title': "Fresh", 'description': "-"}, instance=project)
+        self.assertTrue(form.is_valid(), form.errors)
+
+        self.assertEqual(run_pending(), 1)
+        project.refresh_from_db()
+        self.assertTrue(media.exists(project.image.name))
+
+    def test_replacement_keeps_the_previous_image_until_uploaded(self):
+        project = Project.objects.create(tenant=self.tenant, title="Old", description="-", image='project_images/old.png')
+        project.image = png_upload('new.png')
+        project.save()
+        project.refresh_from_db()
+        self.assertEqual(project.image.name, 'project_images/old.png')
+        run_pending()
+        project.refresh_from_db()
+        self.assertEqual(project.image.name, 'project_images/new.png')
+
+    def test_saving_the_same_upload_twice_queues_it_once(self):
+        project = Project.objects.create(tenant=self.tenant, title="Old", description="-", image='project_images/old.png')
+        project.image = png_upload('new.png')
+        upload = stage_upload(project, 'image', project)
+        self.assertEqual(enqueue_upload(project, upload), enqueue_upload(project, upload))
+        self.assertEqual(Task.objects.filter(name='upload_field_file').count(), 1)
+
+    def test_a_failed_later_upload_does_not_supersede(self):
+        project = Project.objects.create(tenant=self.tenant, title="Old", description="-", image='project_images/old.png')
+        project.image = png_upload('first.png')
+        project.save()
+        project.image = png_upload('second.png')
+        project.save()
+        first, second = Task.objects.filter(name='upload_field_file').order_by('pk')
+        Task.objects.filter(pk=second.pk).update(status=Task.FAILED)
+        run_pending()
+        project.refresh_from_db()
+        self.assertEqual(project.image.name, 'project_images/first.png')
+
+
+class TieredCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.tiered = TieredCache('test')
+        self.calls = 0
+
+    def compute(self, value='fresh', delay=0):
+        def compute():
+            self.calls += 1
+            time.sleep(delay)
+            return value
+        return compute
+
+    def test_concurrent_misses_compute_once(self):
+        threads = 8
+        barrier = threading.Barrier(threads)
+        results = []
+
+        def read():
+            barrier.wait()
+            results.append(self.tiered.get_or_set('key', self.compute(delay=0.2)))
+
+        workers = [threading.Thread(target=read) for _ in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(results, ['fresh'] * threads)
+
+    def test_serves_stale_value_while_another_process_recomputes(self):
+        full_key = self.tiered.make_key('key')
+        cache.set(full_key, Entry('stale', 1.0, time.time() - 1), 60)  # Expired, but still stored
+        cache.add(f'{full_key}:lock', 1)  # Held by another process
+        self.assertEqual(self.tiered.get_or_set('key', self.compute()), 'stale')
+        self.assertEqual(self.calls, 0)
+
+    def test_waits_for_the_lock_holder_then_computes_after_the_lock_timeout(self):
+        self.tiered.lock_timeout = 0.2
+        self.tiered.poll_interval = 0.01
+        cache.add(f"{self.tiered.make_key('key')}:lock", 1)  # Its holder never stores a value
+        start = time.monotonic()
+        self.assertEqual(self.tiered.get_or_set('key', self.compute()), 'fresh')
+        self.assertGreaterEqual(time.monotonic() - start, 0.2)
+        self.assertEqual(self.calls, 1)
+
+    def test_evicted_version_does_not_resurrect_old_entries(self):
+        self.tiered.version_timeout = 0  # Read the version from the backend every time
+        self.tiered.get_or_set('key', self.compute('before edit'))
+        self.tiered.invalidate()
+        self.assertEqual(self.tiered.get_or_set('key', self.compute('after edit')), 'after edit')
+        cache.delete(self.tiered._version_key(None))  # Evicted by the backend
+        self.assertEqual(self.tiered.get_or_set('key', self.compute('reloaded')), 'reloaded')
+
+    def test_local_hit_makes_no_shared_cache_calls(self):
+        self.tiered.get_or_set('key', self.compute())
+        with mock.patch('portfolio.cache.shared_cache') as shared:
+            self.assertEqual(self.tiered.get_or_set('key', self.compute()), 'fresh')
+        self.assertEqual(shared.mock_calls, [])
+        self.assertEqual(self.calls, 1)
+
+    def test_other_processes_see_an_invalidation_once_their_version_expires(self):
+        self.tiered.version_timeout = 0.1
+        other = TieredCache('test', version_timeout=0.1)  # Another worker process
+        self.assertEqual(other.get_or_set('key', self.compute('before edit')), 'before edit')
+        self.tiered.invalidate()
+        self.assertEqual(self.tiered.get_or_set('key', self.compute('after edit')), 'after edit')
+        time.sleep(0.1)
+        self.assertEqual(other.get_or_set('key', self.compute()), 'after edit')
+
+    def test_versioned_map_reloads_after_its_version_is_evicted(self):
+        loads = []
+        table = VersionedMap('test:map:version', lambda: loads.append(1) or {'size': len(loads)})
+        self.assertEqual(table.get(), {'size': 1})
+        self.assertEqual(table.get(), {'size': 1})
+        cache.delete('test:map:version')
+        self.assertEqual(table.get(), {'size': 2})
+
+
+class AdmissionTests(PortfolioTestCase):
+    """Drives AdmissionMiddleware with this process's controller already at its limit."""
+
+    def setUp(self):
+        super().setUp()
+        GeneralInfo.objects.create(tenant=self.tenant, name="Owner")
+        self.project = Project.objects.create(
+            tenant=self.tenant, title="Project", description="-", image='project.png',
+            github_link='https://github.com/example/project',
+        )
+        self.shed = ShedCounter(flush_interval=3600)
+        for patcher in (
+            mock.patch.object(controller, 'in_flight', controller.max_in_flight),
+            mock.patch('portfolio.admission.shed_counter', self.shed),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_normal_request_gets_a_503_at_the_limit(self):
+        response = self.client.post('/contact/', {'name': "A", 'email': 'a@example.com', 'message': "Hi"})
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '1')
+        self.assertFalse(ContactSubmission.objects.exists())
+        self.assertEqual(self.shed.pending, {NORMAL: 1})
+
+    def test_page_is_still_admitted(self):
+        self.assertEqual(self.client.get('/').status_code, 200)
+        self.assertEqual(controller.in_flight, controller.max_in_flight)  # Released again
+
+    def test_shed_tracking_requests_respond_without_writing(self):
+        self.assertEqual(self.client.get('/track_click/', {'action': 'EMAIL_CLICK'}).status_code, 204)
+        code = ShortLink.objects.get(project=self.project, action_type='PROJECT_GITHUB').code
+        response = self.client.get(f'/go/{code}/')
+        self.assertRedirects(response, 'https://github.com/example/project', fetch_redirect_response=False)
+        self.assertFalse(ClickEvent.objects.exists())
+        self.assertEqual(self.shed.pending, {TRACKING: 2})
+
+    def test_shed_counts_reach_the_shared_cache_on_flush(self):
+        self.client.get('/track_click/', {'action': 'EMAIL_CLICK'})
+        self.assertEqual(cache.get(SHED_COUNTER_KEY.format(TRACKING)), None)
+        self.assertEqual(shed_counts(), {TRACKING: 1, NORMAL: 0})
+        self.assertEqual(self.shed.pending, {})
+
+
+class LatencyMonitorTests(SimpleTestCase):
+    def observe(self, monitor, seconds, times):
+        for _ in range(times):
+            monitor.observe(seconds)
+
+    def test_spike_is_measured_against_a_frozen_baseline(self):
+        monitor = LatencyMonitor(max_frozen=60)
+        self.observe(monitor, 0.003, 100)
+        self.observe(monitor, 0.008, 500)
+        self.assertTrue(monitor.overloaded())
+        self.assertLess(monitor.baseline, 0.004)  # Moved only until the spike registered
+
+    def test_lasting_slowdown_becomes_the_new_normal(self):
+        monitor = LatencyMonitor(max_frozen=0.05)
+        self.observe(monitor, 0.003, 100)
+        self.observe(monitor, 0.008, 20)
+        self.assertTrue(monitor.overloaded())
+        time.sleep(0.05)
+        self.observe(monitor, 0.008, 100)
+        self.assertFalse(monitor.overloaded())
+
+
+class LogTests(SimpleTestCase):
+    def record(self, level=logging.INFO, msg="Saved %s", args=("cv.pdf",), exc_info=None, **extra):
+        record = logging.LogRecord('portfolio.test', level, __file__, 1, msg, args, exc_info)
+        record.__dict__.update(extra)
+        return record
+
+    def test_json_formatter_writes_one_object_with_extra_fields(self):
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = self.record(exc_info=sys.exc_info(), event='upload', task_id=7)
+        line = JsonFormatter().format(record)
+        self.assertNotIn("\n", line)
+        payload = json.loads(line)
+        self.assertEqual(payload['level'], 'INFO')
+        self.assertEqual(payload['logger'], 'portfolio.test')
+        self.assertEqual(payload['message'], "Saved cv.pdf")
+        self.assertEqual((payload['event'], payload['task_id']), ('upload', 7))
+        self.assertIn("ValueError: boom", payload['exception'])
+
+    def test_sample_filter_keeps_its_rate_of_info_records_and_every_warning(self):
+        sample = SampleFilter(rate=0.25)
+        with mock.patch('portfolio.log.random.random', side_effect=[0.1, 0.3, 0.5, 0.9]):
+            kept = [sample.filter(self.record()) for _ in range(4)]
+        self.assertEqual(kept, [True, False, False, False])
+        self.assertTrue(SampleFilter(rate=0).filter(self.record(level=logging.WARNING)))
+        record = self.record()
+        SampleFilter(rate=1).filter(record)
+        self.assertEqual(record.sample_rate, 1)
+
+    def test_queue_handler_leaves_the_logged_record_intact(self):
+        handler = QueueStreamHandler(io.StringIO())
+        self.addCleanup(handler.close)
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = self.record(exc_info=sys.exc_info())
+        handler.handle(record)
+        self.assertIsNotNone(record.exc_info)  # Still there for other handlers
+        self.assertIsNone(record.exc_text)
+
+    def test_full_queue_drops_records_and_reports_them_on_close(self):
+        stream = io.StringIO()
+        handler = QueueStreamHandler(stream, maxsize=1)
+        handler.setFormatter(JsonFormatter())
+        handler.listener.stop()  # Nothing drains the queue
+        for _ in range(3):
+            handler.handle(self.record())
+        self.assertEqual(handler.dropped, 2)
+        handler.close()
+        report = json.loads(stream.getvalue().splitlines()[-1])
+        self.assertEqual(report['level'], 'WARNING')
+        self.assertEqual(report['message'], "Dropped 2 log records because the queue was full")
+
+
+@skipUnless(connection.vendor == 'sqlite', "Only the SQLite profile sets these")
+class SQLiteProfileTests(PortfolioTestCase):
+    def test_connections_use_the_profile(self):
+        # The test database lives in memory, which can't use WAL, so open a
+        # file database with the configured settings instead.
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        default = connections['default']
+        profile = type(default)(
+            {**default.settings_dict, 'NAME': os.path.join(directory.name, 'profile.sqlite3')}, alias='profile',
+        )
+        connections['profile'] = profile
+        self.addCleanup(profile.close)
+        self.addCleanup(connections.__delitem__, 'profile')
+        with profile.cursor() as cursor:
+            pragmas = {}
+            for name in ('journal_mode', 'synchronous', 'busy_timeout'):
+                cursor.execute(f'PRAGMA {name}')
+                pragmas[name] = cursor.fetchone()[0]
+        options = settings.DATABASES['default']['OPTIONS']
+        self.assertEqual(pragmas, {'journal_mode': 'wal', 'synchronous': 1, 'busy_timeout': options['timeout'] * 1000})
+        with CaptureQueriesContext(profile) as queries, transaction.atomic(using='profile'):
+            profile.cursor().execute('SELECT 1')
+        self.assertEqual(queries[0]['sql'], 'BEGIN IMMEDIATE')
+
+    def test_serialized_write_is_atomic_and_reentrant(self):
+        with self.assertRaises(ValueError), serialized_write():
+            Tag.objects.create(tenant=self.tenant, name="kept")
+            with serialized_write():
+                Tag.objects.create(tenant=self.tenant, name="nested")
+            raise ValueError
+        self.assertFalse(Tag.objects.exists())
+
+    @mock.patch('portfolio.sqlite.transaction.atomic', return_value=nullcontext())
+    def test_serialized_write_lets_one_thread_in_at_a_time(self, atomic):
+        entered, holding, release = [], threading.Event(), threading.Event()
+
+        def first():
+            with serialized_write():
+                entered.append('first')
+                holding.set()
+                release.wait(5)
+
+        def second():
+            holding.wait(5)
+            with serialized_write():
+                entered.append('second')
+
+        threads = [threading.Thread(target=first), threading.Thread(target=second)]
+        for thread in threads:
+            thread.start()
+        holding.wait(5)
+        time.sleep(0.05)
+        self.assertEqual(entered, ['first'])  # The second thread is waiting on the lock
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(entered, ['first', 'second'])
+
+
+# Committed data (a replica connection only sees that) and no replica lag, so
+# reads go wherever the router sends them.
+# DATABASE_ROUTERS is re-applied so the router is rebuilt and sees the replica.
+@override_settings(
+    STORAGES=TEST_STORAGES, ALLOWED_HOSTS=['*'], REPLICA_LAG_SECONDS=0,
+    DATABASE_ROUTERS=['portfolio.routers.PrimaryReplicaRouter'],
+)
+class RouterTests(TransactionTestCase):
+    """Reads and writes against 'default' and 'replica1', a TEST MIRROR of it."""
+    databases = {'default'}
+
+    @classmethod
+    def setUpClass(cls):
+        # Without REPLICA_DATABASE_URLS there is no replica; stand one in that
+        # opens its own connection to the test database, as a mirror does. A
+        # configured replica has already been mirrored by the test runner.
+        cls.added_replica = 'replica1' not in connections.settings
+        if cls.added_replica:
+            connections.settings['replica1'] = {
+                **connections['default'].settings_dict, 'TEST': {'MIRROR': 'default'},
+            }
+        cls.databases = {'default', 'replica1'}
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        if cls.added_replica:
+            connections['replica1'].close()
+            del connections['replica1']
+            del connections.settings['replica1']
+
+    def setUp(self):
+        cache.clear()
+        portfolio_cache.local.clear()
+        self.tenant = Tenant.objects.create(name="Router", slug='router')
+        Domain.objects.create(host='router.invalid', tenant=self.tenant)
+        seed_portfolio(self.tenant)
+        invalidate_host_map()
+        self.addCleanup(invalidate_host_map)
+        self.client = Client(HTTP_HOST='router.invalid')
+
+    def queries(self, request):
+        """Runs `request()`; returns the SQL it sent to the primary and to the replica."""
+        with CaptureQueriesContext(connections['default']) as primary, \
+                CaptureQueriesContext(connections['replica1']) as replica:
+            request()
+        return [q['sql'] for q in primary], [q['sql'] for q in replica]
+
+    def test_public_get_reads_from_the_replica(self):
+        primary, replica = self.queries(lambda: self.assertContains(self.client.get('/section/projects/'), "Project 0"))
+        self.assertEqual(primary, [])
+        self.assertTrue(replica)
+
+    def test_writes_go_to_the_primary(self):
+        project = Project.objects.get(tenant=self.tenant, title="Project 0")
+        primary, replica = self.queries(
+            lambda: self.client.get('/track_click/', {'action': 'PROJECT_GITHUB', 'details': project.pk}),
+        )
+        self.assertTrue(any(sql.startswith('INSERT') for sql in primary))
+        self.assertFalse(any(sql.startswith(('INSERT', 'UPDATE')) for sql in replica))
+
+    def test_admin_uses_the_primary_and_pins_the_editor_to_it(self):
+        self.client.force_login(get_user_model().objects.create_superuser('editor'))
+        primary, replica = self.queries(lambda: self.assertEqual(self.client.get('/admin/portfolio/tag/').status_code, 200))
+        self.assertTrue(primary)
+        self.assertEqual(replica, [])
+
+        response = self.client.post('/admin/portfolio/tag/add/', {'tenant': self.tenant.pk, 'name': 'router'})
+        self.assertEqual(response.status_code, 302)
+        self.assertIn('primary_reads', response.cookies)
+        # Until the cookie expires, the editor's public page views skip the replica too.
+        _, replica = self.queries(lambda: self.client.get('/section/projects/'))
+        self.assertEqual(replica, [])
+
+    def test_reads_inside_serialized_write_stay_on_the_primary(self):
+        with replica_reads():
+            _, replica = self.queries(lambda: list(Tenant.objects.all()))
+        self.assertTrue(replica)
+        with replica_reads(), serialized_write():
+            primary, replica = self.queries(lambda: list(Tenant.objects.all()))
+        self.assertTrue(primary)
+        self.assertEqual(replica, [])
+
+
+# Boots the WSGI entry point in a fresh interpreter, migrates an in-memory
+# database and sends requests through the handler, reporting what was imported.
+COLD_START_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import {wsgi}
+boot_ms = (time.perf_counter() - start) * 1000
+from django.core.management import call_command
+from django.test import Client, override_settings
+call_command('migrate', verbosity=0)
+client = Client(HTTP_HOST='localhost')
+report = {{'boot_ms': boot_ms, 'booted_with_admin': 'portfolio.admin' in sys.modules}}
+with override_settings(STORAGES={storages!r}):
+    for path in ('/', '/section/skills/', '/no-such-page/', '/admin/login/'):
+        status = client.get(path).status_code
+        report[path] = [status, 'portfolio.admin' in sys.modules]
+print(json.dumps(report))
+"""
+
+
+class ColdStartTests(SimpleTestCase):
+    BUDGET_MS = 1500  # Importing the WSGI entry point; about 250 ms on a developer laptop
+
+    def test_admin_loads_on_first_admin_request(self):
+        script = COLD_START_SCRIPT.format(wsgi=settings.WSGI_APPLICATION.rsplit('.', 1)[0], storages=TEST_STORAGES)
+        env = {**os.environ, 'DATABASE_URL': 'sqlite://:memory:', 'REPLICA_DATABASE_URLS': '', 'CACHE_URL': 'locmemcache://'}
+        result = subprocess.run(
+            [sys.executable, '-c', script], capture_output=True, text=True, env=env, cwd=settings.BASE_DIR,
+        )
+        self.assertEqual(result.returncode, 0, result.stderr[-2000:])
+        report = json.loads(result.stdout.strip().splitlines()[-1])
+
+        self.assertLess(report['boot_ms'], self.BUDGET_MS)
+        self.assertFalse(report['booted_with_admin'])
+        self.assertEqual(report['/'], [200, False])
+        self.assertEqual(report['/section/skills/'], [200, False])
+        self.assertEqual(report['/no-such-page/'], [404, False])
+        self.assertEqual(report['/admin/login/'], [200, True])
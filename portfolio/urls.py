@@ -3,8 +3,13 @@
 from django.urls import path
 from .views import portfolio_view
 from .views import portfolio_view, track_click # Add track_click here
+from .views import portfolio_section, follow_short_link, admission_stats, contact_submit
 
 urlpatterns = [
     path('', portfolio_view, name='portfolio'),
     path('track_click/', track_click, name='track_click'),
+    path('contact/', contact_submit, name='contact_submit'),
+    path('section/<slug:section>/', portfolio_section, name='portfolio_section'),
+    path('go/<slug:code>/', follow_short_link, name='follow_short_link'),
+    path('admission/stats/', admission_stats, name='admission_stats'),
 ]
\ No newline at end of file
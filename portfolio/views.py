@@ -3,8 +3,21 @@
 import logging  # 1. Import the logging library
 from django.shortcuts import render, redirect
 from django.contrib import messages
+from django.template.loader import render_to_string
+from django.contrib.admin.views.decorators import staff_member_required
+from .admission import PAGE, TRACKING, admission_priority, controller, shed_counts
+from .cache import portfolio_cache
+from .dimensions import intern_ip, intern_user_agent
+from .engagement import popular_ranks, record_click
 from .forms import ContactForm
-from django.http import HttpResponse, HttpResponseRedirect
+from .middleware import sessionless
+from .preload import preload_critical_assets
+from .routers import primary_reads_since
+from .shortlinks import project_link_codes, resolve_short_link, resume_link_code
+from .sqlite import serialized_write
+from .tasks import enqueue
+from django.http import Http404, HttpResponse, HttpResponseRedirect, JsonResponse
+from django.views.decorators.http import require_POST
 from .models import (
     GeneralInfo,
     SkillCategory,
@@ -17,6 +30,8 @@ from .models import (
 
 # 2. Get an instance of the logger for this file
 logger = logging.getLogger(__name__)
+# One record per click, so this logger is sampled (see LOGGING in settings.py).
+click_logger = logging.getLogger('portfolio.clicks')
 
 
 # --- Helper function to get the real IP address ---
@@ -30,69 +45,209 @@ def get_ip_address(request):
     return ip
 
 
+CONTACT_SUCCESS_MESSAGE = 'Thank you for your message! I will get back to you soon.'
+
+
+def _save_contact_submission(request, form):
+    # 3. Add success logging
+    logger.info("New contact form submission from %s", form.cleaned_data.get('email'), extra={'event': 'contact'})
+    submission = form.save(commit=False)
+    submission.tenant = request.tenant
+    with serialized_write():
+        submission.save()
+        enqueue(
+            'notify_contact_submission',
+            payload={'submission_id': submission.pk},
+            idempotency_key=f'contact-notify:{submission.pk}',
+        )
+
+
 # --- Main view for displaying the portfolio page ---
+@sessionless
+@preload_critical_assets
+@admission_priority(PAGE)
 def portfolio_view(request):
     if request.method == 'POST':
         form = ContactForm(request.POST)
+        # Browsers with JS post to `contact_submit` instead; this is the no-JS fallback.
         if form.is_valid():
-            # 3. Add success logging
-            logger.info(f"New contact form submission from {form.cleaned_data.get('email')}")
-            form.save()
-            messages.success(request, 'Thank you for your message! I will get back to you soon.')
+            _save_contact_submission(request, form)
+            messages.success(request, CONTACT_SUCCESS_MESSAGE)
             return redirect('portfolio')
         else:
             # 4. Add error logging for form validation failures
-            logger.error(f"Contact form submission failed. Errors: {form.errors.as_json()}")
+            logger.error("Contact form submission failed. Errors: %s", form.errors.as_json())
             messages.error(request, 'There was an error with your submission. Please check the form and try again.')
     else:
         form = ContactForm()
 
-    general_info = GeneralInfo.objects.first()
-    skill_categories = SkillCategory.objects.prefetch_related('skills').all()
-    expertises = Expertise.objects.all()
-    project_categories = ProjectCategory.objects.all()
-    projects = Project.objects.prefetch_related('categories', 'tags').all()
-    social_links = SocialLink.objects.all()
-
+    # The skills and projects sections are rendered as placeholders and filled
+    # in by `portfolio_section` once they scroll into view. Without JS (or for
+    # crawlers) the placeholders link to ?sections=inline, which includes them.
     context = {
         'form': form,
-        'info': general_info,
-        'skill_categories': skill_categories,
-        'expertises': expertises,
-        'project_categories': project_categories,
-        'projects': projects,
-        'social_links': social_links,
+        **_cached(request.tenant, 'page', lambda: _page_content(request.tenant)),
     }
+    if request.GET.get('sections') == 'inline':
+        context['inline_sections'] = {section: _section_html(request.tenant, section) for section in DEFERRED_SECTIONS}
     return render(request, 'index.html', context)
 
 
-# --- View for tracking user clicks ---
+def _cached(tenant, key, compute):
+    """portfolio_cache.get_or_set() in `tenant`'s namespace."""
+    def fill():
+        # Right after an edit invalidated the entry, a replica may not have the edit yet.
+        with primary_reads_since(portfolio_cache.version(tenant.pk)):
+            return compute()
+    return portfolio_cache.get_or_set(key, fill, namespace=tenant.pk)
+
+
+@sessionless
+@require_POST
+def contact_submit(request):
+    """The contact form's fetch() target: validates and saves without rendering the page."""
+    form = ContactForm(request.POST)
+    if not form.is_valid():
+        logger.error("Contact form submission failed. Errors: %s", form.errors.as_json())
+        errors = {field: list(field_errors) for field, field_errors in form.errors.items()}
+        return JsonResponse({'errors': errors}, status=400)
+    _save_contact_submission(request, form)
+    return JsonResponse({'message': CONTACT_SUCCESS_MESSAGE}, status=201)
+
+
+def _page_content(tenant):
+    # The form, CSRF token and messages vary per request, so only the content
+    # is cached here rather than the rendered page.
+    return {
+        'info': GeneralInfo.objects.filter(tenant=tenant).first(),
+        'social_links': list(SocialLink.objects.filter(tenant=tenant)),
+        'resume_code': resume_link_code(tenant.pk),
+    }
+
+
+# --- Deferred sections, fetched by script.js when scrolled into view ---
+def _skills_context(tenant):
+    return {
+        'skill_categories': SkillCategory.objects.filter(tenant=tenant).prefetch_related('skills'),
+        'expertises': Expertise.objects.filter(tenant=tenant),
+    }
+
+
+def _projects_context(tenant):
+    projects = list(Project.objects.filter(tenant=tenant).for_grid())
+    ranks = popular_ranks(tenant)
+    codes = project_link_codes(tenant.pk)
+    for project in projects:
+        project.popular_rank = ranks.get(project.pk)
+        project.github_code = codes.get((project.pk, 'PROJECT_GITHUB'))
+        project.live_demo_code = codes.get((project.pk, 'PROJECT_LIVE_DEMO'))
+    return {
+        'project_categories': ProjectCategory.objects.filter(tenant=tenant).only('name', 'slug'),
+        'projects': projects,
+        'has_popular': bool(ranks),
+    }
+
+
+DEFERRED_SECTIONS = {
+    'skills': ('partials/skills.html', _skills_context),
+    'projects': ('partials/projects.html', _projects_context),
+}
+
+
+def _section_html(tenant, section):
+    # Fragments contain no per-request data, so the rendered HTML is cached.
+    template_name, get_context = DEFERRED_SECTIONS[section]
+    return _cached(tenant, f'section:{section}', lambda: render_to_string(template_name, get_context(tenant)))
+
+
+@sessionless
+@admission_priority(PAGE)
+def portfolio_section(request, section):
+    """Renders the HTML fragment for one below-the-fold section."""
+    if section not in DEFERRED_SECTIONS:
+        raise Http404(f"Unknown section '{section}'.")
+    return HttpResponse(_section_html(request.tenant, section))
+
+
+# --- Outbound links: /go/<code>/ records the click and redirects ---
+@sessionless
+@admission_priority(TRACKING)
+def follow_short_link(request, code):
+    link = resolve_short_link(code)
+    if link is None or link.tenant_id != request.tenant.pk:
+        raise Http404("Unknown link.")
+    if getattr(request, 'shed_writes', False):
+        # Under load the visitor still gets their redirect; only the analytics are dropped.
+        return HttpResponseRedirect(link.target_url)
+    click_logger.info(
+        "Following short link %s", code,
+        extra={'event': 'click', 'action': link.action_type, 'project_id': link.project_id},
+    )
+    with serialized_write():
+        ClickEvent.objects.create(
+            tenant=request.tenant,
+            action_type=link.action_type,
+            ip_id=intern_ip(get_ip_address(request)),
+            agent_id=intern_user_agent(request.META.get('HTTP_USER_AGENT', '')),
+            project_id=link.project_id,
+        )
+        record_click(link.project_id, link.action_type)
+    return HttpResponseRedirect(link.target_url)
+
+
+# --- View for tracking user clicks (the email beacon in script.js) ---
+@sessionless
+@admission_priority(TRACKING)
 def track_click(request):
     action = request.GET.get('action')
-    redirect_url = request.GET.get('redirect_url')
     details_param = request.GET.get('details')
 
+    if getattr(request, 'shed_writes', False):
+        action = None  # Shed under load: respond as usual without recording
+
     project_instance = None
     if action in ['PROJECT_LIVE_DEMO', 'PROJECT_GITHUB'] and details_param:
         try:
-            project_instance = Project.objects.get(pk=int(details_param))
+            project_instance = Project.objects.get(pk=int(details_param), tenant=request.tenant)
         except (Project.DoesNotExist, ValueError):
             # 5. Add warning log for non-critical errors
-            logger.warning(f"Could not find project with ID '{details_param}' for click tracking.")
+            logger.warning("Could not find project with ID '%s' for click tracking.", details_param)
             project_instance = None
 
     if action:
+        ip_address = get_ip_address(request)
         # 6. Add info logging for tracking events
-        logger.info(f"Tracking click event. Action: {action}, Details: {details_param}, IP: {get_ip_address(request)}")
-        ClickEvent.objects.create(
-            action_type=action,
-            ip_address=get_ip_address(request),
-            user_agent=request.META.get('HTTP_USER_AGENT', ''),
-            project=project_instance,
-            details=f"Project ID: {details_param}" if project_instance else details_param
+        click_logger.info(
+            "Tracking click event. Action: %s, Details: %s", action, details_param,
+            extra={'event': 'click', 'action': action, 'ip': ip_address},
         )
+        with serialized_write():
+            ClickEvent.objects.create(
+                tenant=request.tenant,
+                action_type=action,
+                ip_id=intern_ip(ip_address),
+                agent_id=intern_user_agent(request.META.get('HTTP_USER_AGENT', '')),
+                project=project_instance,
+                details=f"Project ID: {details_param}" if project_instance else details_param
+            )
+            if project_instance:
+                record_click(project_instance.pk, action)
+
+    return HttpResponse(status=204)
 
-    if redirect_url:
-        return HttpResponseRedirect(redirect_url)
 
-    return HttpResponse(status=204)
\ No newline at end of file
+# --- Load shedding counters, for staff ---
+# A path rather than 'admin:login': this view is served from PUBLIC_URLCONF.
+@staff_member_required(login_url='/admin/login/')
+def admission_stats(request):
+    latency = controller.latency
+    return JsonResponse({
+        'in_flight': controller.in_flight,  # This worker process only
+        'max_in_flight': controller.max_in_flight,
+        'db_latency_ms': {
+            'recent': latency.recent and latency.recent * 1000,
+            'baseline': latency.baseline and latency.baseline * 1000,
+            'overloaded': latency.overloaded(),
+        },
+        'shed': shed_counts(),
+    })
@@ -13,4 +13,9 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "portfolio_project.settings")
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported once Django is set up; sends 103 Early Hints where the server supports them.
+from portfolio.preload import EarlyHintsMiddleware  # noqa: E402
+
+application = EarlyHintsMiddleware(django_application)
@@ -0,0 +1,15 @@
+# portfolio_project/public_urls.py
+
+from django.urls import path, include
+from django.conf import settings
+from django.conf.urls.static import static
+
+# The site without the admin. PublicURLconfMiddleware serves every request
+# outside /admin from here; urls.py adds the admin for the rest.
+urlpatterns = [
+    path('', include('portfolio.urls')), # Include your app's urls
+]
+
+# Serve media files in development
+if settings.DEBUG:
+    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -13,13 +13,18 @@ SECRET_KEY = env('SECRET_KEY')
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = env.bool('DEBUG', default=False)
 
-ALLOWED_HOSTS = ['muhiuddins-portfolio.onrender.com','localhost', '127.0.0.1']
+# Each tenant's hosts live in the Domain table. Set ALLOWED_HOSTS=* to serve any
+# of them without a redeploy; TenantMiddleware still 404s hosts it doesn't know.
+ALLOWED_HOSTS = env.list('ALLOWED_HOSTS', default=['muhiuddins-portfolio.onrender.com','localhost', '127.0.0.1'])
 
 
 # Application definition
 
 INSTALLED_APPS = [
-    "django.contrib.admin",
+    # SimpleAdminConfig skips autodiscovery at startup; admin modules are
+    # imported by portfolio_project/urls.py, which only admin requests load
+    # (see PUBLIC_URLCONF).
+    "django.contrib.admin.apps.SimpleAdminConfig",
     "django.contrib.auth",
     "django.contrib.contenttypes",
     "django.contrib.sessions",
@@ -27,21 +32,37 @@ INSTALLED_APPS = [
     "django.contrib.staticfiles",
     "portfolio",
     'cloudinary_storage', # ADD THIS
-    'cloudinary',         # ADD THIS
 ]
 
 MIDDLEWARE = [
+    # Requests outside /admin resolve against PUBLIC_URLCONF
+    "portfolio.middleware.PublicURLconfMiddleware",
     "django.middleware.security.SecurityMiddleware",
     'whitenoise.middleware.WhiteNoiseMiddleware', # Add WhiteNoise here
-    "django.contrib.sessions.middleware.SessionMiddleware",
+    # Sheds click tracking first, then other writes, when the worker or DB is overloaded
+    "portfolio.admission.AdmissionMiddleware",
+    # Public read-only requests may read from replicas; everything else uses the primary
+    "portfolio.middleware.ReplicaReadMiddleware",
+    # Picks the portfolio (request.tenant) from the Host header
+    "portfolio.tenants.TenantMiddleware",
+    # Link: rel=preload headers for the portfolio page's critical assets
+    "portfolio.preload.PreloadLinkMiddleware",
+    # Public pages marked @sessionless skip session and user loading entirely
+    "portfolio.middleware.PublicSessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
-    "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "portfolio.middleware.PublicAuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
 ROOT_URLCONF = "portfolio_project.urls"
+# The same site without the admin, so serving it never imports admin modules.
+PUBLIC_URLCONF = "portfolio_project.public_urls"
+
+# Flash messages live in a signed cookie so anonymous visitors never touch the
+# session table (the default FallbackStorage spills large messages into it).
+MESSAGE_STORAGE = 'django.contrib.messages.storage.cookie.CookieStorage'
 
 TEMPLATES = [
     {
@@ -64,11 +85,62 @@ WSGI_APPLICATION = "portfolio_project.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# The URL's scheme picks the backend: postgres://... or sqlite:////path/to/db.sqlite3
 DATABASES = {
-    'default': env.db_url(
-        'DATABASE_URL',
-        engine='django.db.backends.postgresql'
-    )
+    'default': env.db_url('DATABASE_URL')
+}
+
+# SQLite profile for single-node deployments, e.g.
+# DATABASE_URL=sqlite:////var/data/portfolio.sqlite3. WAL lets page reads run
+# alongside the one writer; IMMEDIATE transactions take the write lock up front,
+# so concurrent writers wait up to `timeout` seconds instead of failing with
+# "database is locked" (see portfolio/sqlite.py for how writes are grouped).
+if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    DATABASES['default'].setdefault('OPTIONS', {}).update({
+        'init_command': ';'.join([
+            'PRAGMA journal_mode=WAL',
+            'PRAGMA synchronous=NORMAL',  # Safe with WAL; a crash may lose only the last commits
+            f"PRAGMA mmap_size={env.int('SQLITE_MMAP_SIZE', default=256 * 1024 * 1024)}",
+            f"PRAGMA cache_size=-{env.int('SQLITE_CACHE_KIB', default=64 * 1024)}",  # Negative: KiB, not pages
+            'PRAGMA temp_store=MEMORY',
+        ]),
+        'transaction_mode': 'IMMEDIATE',
+        'timeout': env.int('SQLITE_BUSY_TIMEOUT', default=20),
+    })
+    # The page cache above belongs to a connection, so keep connections open.
+    DATABASES['default']['CONN_MAX_AGE'] = env.int('CONN_MAX_AGE', default=600)
+
+# Optional read replicas as a comma-separated list of URLs. Public pages read
+# from them; writes, the admin and the task worker stay on 'default'.
+REPLICA_DATABASE_URLS = env.list('REPLICA_DATABASE_URLS', default=[])
+for number, url in enumerate(REPLICA_DATABASE_URLS, start=1):
+    # Tests run against 'default' only, with the replicas as aliases of it.
+    DATABASES[f'replica{number}'] = {**env.db_url_config(url), 'TEST': {'MIRROR': 'default'}}
+
+DATABASE_ROUTERS = ['portfolio.routers.PrimaryReplicaRouter']
+
+# Upper bound on replica lag. For this long after a write, the writer's browser
+# and refills of just-invalidated caches read from the primary instead.
+REPLICA_LAG_SECONDS = env.int('REPLICA_LAG_SECONDS', default=5)
+
+
+# Admission control (portfolio/admission.py)
+# Requests one worker process runs at once before it starts shedding; tracking
+# writes are shed from half of this, other non-page requests get a 503 at it.
+# Counted per process: with the Procfile's sync gunicorn workers a process
+# never runs more than one request, so this only applies with --threads or ASGI.
+ADMISSION_MAX_IN_FLIGHT = env.int('ADMISSION_MAX_IN_FLIGHT', default=16)
+# Tracking writes are also shed while recent DB latency exceeds this multiple of its baseline.
+ADMISSION_LATENCY_TOLERANCE = env.float('ADMISSION_LATENCY_TOLERANCE', default=2.0)
+# How long that baseline ignores a slowdown before accepting it as the new normal.
+ADMISSION_BASELINE_FREEZE_SECONDS = env.float('ADMISSION_BASELINE_FREEZE_SECONDS', default=60.0)
+
+
+# Cache
+# Backs the second tier of portfolio/cache.py. Use a shared backend such as
+# Redis or Memcached in production so invalidation reaches every worker.
+CACHES = {
+    'default': env.cache_url('CACHE_URL', default='locmemcache://'),
 }
 
 
@@ -110,24 +182,42 @@ USE_TZ = True
 STATIC_URL = '/static/'
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
 MEDIA_URL = '/media/'
 
+# Django 5.1+ only reads storages from STORAGES. The Cloudinary client is
+# imported, and its credentials checked, the first time a media file is used.
+STORAGES = {
+    'default': {
+        'BACKEND': 'portfolio.storage.LazyMediaCloudinaryStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage',
+    },
+}
+
 # Cloudinary Media Storage Configuration
-DEFAULT_FILE_STORAGE = 'cloudinary_storage.storage.MediaCloudinaryStorage'
 CLOUDINARY_STORAGE = {
-    'CLOUD_NAME': env('CLOUDINARY_CLOUD_NAME'),
-    'API_KEY': env('CLOUDINARY_API_KEY'),
-    'API_SECRET': env('CLOUDINARY_API_SECRET'),
+    key: value for key, value in {
+        'CLOUD_NAME': env('CLOUDINARY_CLOUD_NAME', default=None),
+        'API_KEY': env('CLOUDINARY_API_KEY', default=None),
+        'API_SECRET': env('CLOUDINARY_API_SECRET', default=None),
+    }.items() if value
 }
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Email (sent from the background task worker, see `manage.py run_worker`)
+EMAIL_CONFIG = env.email_url('EMAIL_URL', default='consolemail://')
+vars().update(EMAIL_CONFIG)
+DEFAULT_FROM_EMAIL = env('DEFAULT_FROM_EMAIL', default='webmaster@localhost')
+
 # =============================================================================
 # LOGGING CONFIGURATION
 # =============================================================================
 
+# Records are written as JSON lines by a background thread (portfolio/log.py);
+# set LOG_FORMAT=text for human-readable local output.
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -136,11 +226,21 @@ LOGGING = {
             'format': '{levelname} {asctime} {module} {message}',
             'style': '{',
         },
+        'json': {
+            '()': 'portfolio.log.JsonFormatter',
+        },
+    },
+    'filters': {
+        # Click tracking logs one line per click; keep a sample of them.
+        'sample_clicks': {
+            '()': 'portfolio.log.SampleFilter',
+            'rate': env.float('CLICK_LOG_SAMPLE_RATE', default=0.1),
+        },
     },
     'handlers': {
         'console': {
-            'class': 'logging.StreamHandler',
-            'formatter': 'verbose',
+            'class': 'portfolio.log.QueueStreamHandler',
+            'formatter': 'verbose' if env('LOG_FORMAT', default='json') == 'text' else 'json',
         },
     },
     'loggers': {
@@ -154,5 +254,8 @@ LOGGING = {
             'level': 'DEBUG', # Set to DEBUG to capture all levels of logs from your app
             'propagate': True,
         },
+        'portfolio.clicks': {
+            'filters': ['sample_clicks'],
+        },
     },
-}
\ No newline at end of file
+}
@@ -1,15 +1,15 @@
 # portfolio_project/urls.py
 
 from django.contrib import admin
-from django.urls import path, include
-from django.conf import settings
-from django.conf.urls.static import static
+from django.urls import path
+
+from . import public_urls
+
+# Admin modules are discovered here rather than at app loading (see
+# SimpleAdminConfig in settings). Public requests resolve against
+# public_urls.py instead, so this first runs on the first admin request.
+admin.autodiscover()
 
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('', include('portfolio.urls')), # Include your app's urls
-]
-
-# Serve media files in development
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+] + public_urls.urlpatterns
@@ -15,14 +15,8 @@ function main() {
     navMenu: document.querySelector(".nav-menu"),
     allSections: document.querySelectorAll("main > section"),
     sectionHeaders: document.querySelectorAll(".section-header"),
-    spotlightCards: document.querySelectorAll(".skill-card, .expertise-card, .project-card, .contact-card"),
+    deferredSections: document.querySelectorAll("[data-deferred-url]"),
     statItems: document.querySelectorAll(".stat-item"),
-    skillTabsContainer: document.querySelector(".skills-tabs"),
-    skillPanels: document.querySelectorAll(".skills-panel"),
-    subTabsContainer: document.querySelector(".skills-sub-tabs"),
-    skillCards: document.querySelectorAll(".skills-grid .skill-card"),
-    projectFiltersContainer: document.querySelector(".project-filters"),
-    projectCards: document.querySelectorAll(".all-projects-grid .project-card"),
     contactForm: document.querySelector(".contact-form"),
     formContainer: document.getElementById("form-container"),
     successMessage: document.getElementById("success-message"),
@@ -32,16 +26,20 @@ function main() {
     emailTrackButton: document.getElementById("track-email-click"),
   };
 
+  /** Cards that get the cursor spotlight effect, including deferred ones. */
+  const SPOTLIGHT_SELECTOR = ".skill-card, .expertise-card, .project-card, .contact-card";
+
   /**
    * Sets up core navigation features: smooth scrolling, scroll effects, and mobile menu.
    */
   const initNavigation = () => {
-    // Smooth Scrolling for anchor links
-    document.querySelectorAll('a[href^="#"]').forEach(anchor => {
-      anchor.addEventListener("click", function (e) {
-        e.preventDefault();
-        document.querySelector(this.getAttribute("href"))?.scrollIntoView({ behavior: "smooth" });
-      });
+    // Smooth Scrolling for anchor links (delegated, so deferred sections are covered too)
+    document.addEventListener("click", e => {
+      const anchor = e.target.closest('a[href^="#"]');
+      const href = anchor?.getAttribute("href");
+      if (!href || href === "#") return;
+      e.preventDefault();
+      document.querySelector(href)?.scrollIntoView({ behavior: "smooth" });
     });
 
     // Navbar scroll effect
@@ -69,38 +67,77 @@ function main() {
 
   /**
    * Initializes all content filtering using event delegation.
+   * Cards are looked up on every click because the grids arrive after page load.
    */
   const initFiltering = () => {
-    // Main Skills Tabs (Tech Stack / Expertise)
-    elements.skillTabsContainer?.addEventListener("click", e => {
-      if (!e.target.matches(".tab-btn")) return;
-      elements.skillTabsContainer.querySelectorAll(".tab-btn").forEach(t => t.classList.remove("active"));
-      e.target.classList.add("active");
-      elements.skillPanels.forEach(p => p.classList.remove("active"));
-      document.querySelector(e.target.dataset.target)?.classList.add("active");
-    });
-
-    const setupFilter = (container, buttonSelector, cards, dataAttribute) => {
-      if (!container) return;
-      container.addEventListener('click', e => {
-        if (!e.target.matches(buttonSelector)) return;
-        const filter = e.target.dataset[dataAttribute];
-        container.querySelectorAll(buttonSelector).forEach(btn => btn.classList.remove('active'));
-        e.target.classList.add('active');
-        cards.forEach(card => {
+    const setupFilter = (buttonSelector, cardSelector, dataAttribute, onFilter) => {
+      document.addEventListener('click', e => {
+        const button = e.target.closest(buttonSelector);
+        if (!button) return;
+        const filter = button.dataset[dataAttribute];
+        button.parentElement.querySelectorAll(buttonSelector).forEach(btn => btn.classList.remove('active'));
+        button.classList.add('active');
+        document.querySelectorAll(cardSelector).forEach(card => {
           const categories = card.dataset.category?.split(' ') || [];
           const shouldShow = filter === 'all' || categories.includes(filter);
           card.classList.toggle('hide', !shouldShow);
+          onFilter?.(card, filter);
         });
       });
     };
 
-    setupFilter(elements.subTabsContainer, '.sub-tab-btn', elements.skillCards, 'category');
-    setupFilter(elements.projectFiltersContainer, '.filter-btn', elements.projectCards, 'filter');
+    // Main Skills Tabs (Tech Stack / Expertise)
+    document.addEventListener("click", e => {
+      const tab = e.target.closest(".tab-btn");
+      if (!tab) return;
+      tab.parentElement.querySelectorAll(".tab-btn").forEach(t => t.classList.remove("active"));
+      tab.classList.add("active");
+      document.querySelectorAll(".skills-panel").forEach(p => p.classList.remove("active"));
+      document.querySelector(tab.dataset.target)?.classList.add("active");
+    });
+
+    setupFilter('.sub-tab-btn', '.skills-grid .skill-card', 'category');
+    // "Most Popular" also reorders the grid by the server-provided rank
+    setupFilter('.filter-btn', '.all-projects-grid .project-card', 'filter', (card, filter) => {
+      card.style.order = filter === 'popular' ? card.dataset.popularRank || '' : '';
+    });
+  };
 
-    // Set initial states
-    elements.subTabsContainer?.querySelector('[data-category="all"]')?.click();
-    elements.projectFiltersContainer?.querySelector('[data-filter="featured"]')?.click();
+  /**
+   * Sets the initial filter state of a freshly inserted section.
+   */
+  const initSectionFilters = section => {
+    section.querySelector('.skills-sub-tabs [data-category="all"]')?.click();
+    section.querySelector('.project-filters [data-filter="featured"]')?.click();
+  };
+
+  /**
+   * Fetches below-the-fold sections shortly before they scroll into view.
+   */
+  const initDeferredSections = () => {
+    const load = async placeholder => {
+      try {
+        const response = await fetch(placeholder.dataset.deferredUrl, { headers: { "X-Requested-With": "XMLHttpRequest" } });
+        if (!response.ok) throw new Error(`HTTP ${response.status}`);
+        placeholder.innerHTML = await response.text();
+        placeholder.removeAttribute("aria-busy");
+        initSectionFilters(placeholder);
+      } catch (error) {
+        console.error("Could not load section:", error);
+      }
+    };
+
+    const observer = new IntersectionObserver((entries, obs) => {
+      entries.forEach(entry => {
+        if (entry.isIntersecting) {
+          obs.unobserve(entry.target);
+          load(entry.target);
+        }
+      });
+    }, { rootMargin: "400px 0px" });
+    elements.deferredSections.forEach(section => observer.observe(section));
+    // Sections the server already included (?sections=inline) only need their filters set.
+    document.querySelectorAll(".deferred-section:not([data-deferred-url])").forEach(initSectionFilters);
   };
 
   /**
@@ -134,28 +171,37 @@ function main() {
     }, { rootMargin: "-40% 0px -60% 0px" });
     elements.allSections.forEach(section => navObserver.observe(section));
 
-    elements.spotlightCards.forEach(card => {
-      card.addEventListener("mousemove", e => {
-        const rect = card.getBoundingClientRect();
-        card.style.setProperty("--mouse-x", `${e.clientX - rect.left}px`);
-        card.style.setProperty("--mouse-y", `${e.clientY - rect.top}px`);
-      });
-    });
+    // One delegated pointer handler, throttled to a single update per animation frame.
+    let lastPointer = null;
+    let frameRequested = false;
+    const applyPointer = () => {
+      frameRequested = false;
+      const { clientX, clientY, target } = lastPointer;
+
+      document.documentElement.style.setProperty('--mouse-x', clientX + 'px');
+      document.documentElement.style.setProperty('--mouse-y', clientY + 'px');
 
-    if (elements.gradientsContainer) {
-      window.addEventListener("mousemove", (e) => {
-        const { clientX, clientY } = e;
+      if (elements.gradientsContainer) {
         const x = (clientX / window.innerWidth) * 2 - 1;
         const y = (clientY / window.innerHeight) * 2 - 1;
         elements.gradientsContainer.style.transform = `translate(${-x * 30}px, ${-y * 30}px)`;
-      });
-    }
+      }
 
-    window.addEventListener("mousemove", e => {
-      document.documentElement.style.setProperty('--mouse-x', e.clientX + 'px');
-      document.documentElement.style.setProperty('--mouse-y', e.clientY + 'px');
-    });
+      const card = target instanceof Element ? target.closest(SPOTLIGHT_SELECTOR) : null;
+      if (card) {
+        const rect = card.getBoundingClientRect();
+        card.style.setProperty("--mouse-x", `${clientX - rect.left}px`);
+        card.style.setProperty("--mouse-y", `${clientY - rect.top}px`);
+      }
+    };
 
+    document.addEventListener("mousemove", e => {
+      lastPointer = e;
+      if (!frameRequested) {
+        frameRequested = true;
+        requestAnimationFrame(applyPointer);
+      }
+    }, { passive: true });
   };
 
   /**
@@ -196,9 +242,80 @@ function main() {
       return isValid;
     };
 
-    elements.contactForm.addEventListener("submit", e => {
+    const showSuccess = message => {
+      const success = document.getElementById("success-template").content.firstElementChild.cloneNode(true);
+      success.querySelector(".success-text").textContent = message;
+      elements.formContainer.after(success);
+      elements.formContainer.style.display = "none";
+      success.style.display = "flex";
+    };
+
+    const clearErrors = () => {
+      elements.contactForm.querySelectorAll(".form-group.invalid").forEach(formGroup => {
+        formGroup.classList.remove("invalid");
+        formGroup.querySelector(".error-message").textContent = "";
+      });
+      elements.contactSection.querySelector(".message.error.submit-failed")?.remove();
+    };
+
+    const showErrors = errors => {
+      Object.entries(errors).forEach(([name, messages]) => {
+        const formGroup = elements.contactForm.elements[name]?.closest(".form-group");
+        if (!formGroup) return;
+        formGroup.classList.add("invalid");
+        formGroup.querySelector(".error-message").textContent = messages.join(" ");
+      });
+    };
+
+    // Same markup as the server-rendered error messages.
+    const showFailure = () => {
+      const failure = document.createElement("div");
+      failure.className = "message error submit-failed";
+      failure.setAttribute("role", "alert");
+      failure.textContent = "Your message couldn't be sent right now. Please try again in a moment.";
+      const close = document.createElement("span");
+      close.className = "close-message";
+      close.innerHTML = "&times;";
+      close.addEventListener("click", () => failure.remove());
+      failure.append(close);
+      elements.contactSection.querySelector(".messages-top").append(failure);
+    };
+
+    // Submits through the JSON endpoint. Browsers without fetch (or without
+    // JS) post the form normally; any other failure is reported in place so
+    // the visitor keeps what they typed.
+    elements.contactForm.addEventListener("submit", async e => {
       const isFormValid = [...requiredInputs].every(input => validateInput(input));
-      if (!isFormValid) e.preventDefault();
+      if (!isFormValid) {
+        e.preventDefault();
+        return;
+      }
+      const submitUrl = elements.contactForm.dataset.submitUrl;
+      if (!submitUrl || !window.fetch) return;
+
+      e.preventDefault();
+      clearErrors();
+      const button = elements.contactForm.querySelector('button[type="submit"]');
+      button.disabled = true;
+      try {
+        const response = await fetch(submitUrl, {
+          method: "POST",
+          body: new FormData(elements.contactForm),
+          headers: { Accept: "application/json" },
+          credentials: "same-origin",
+        });
+        if (response.ok) {
+          showSuccess((await response.json()).message);
+        } else if (response.status === 400) {
+          showErrors((await response.json()).errors);
+        } else {
+          showFailure(); // 5xx, a 503 while shedding, or a 403 for a stale CSRF token
+        }
+      } catch (error) {
+        showFailure(); // Network failure
+      } finally {
+        button.disabled = false;
+      }
     });
 
     requiredInputs.forEach(input => {
@@ -227,6 +344,7 @@ function main() {
   // Run all initialization modules
   initNavigation();
   initFiltering();
+  initDeferredSections();
   initAnimationsAndEffects();
   initContactForm();
   initAnalytics();